@@ -4,20 +4,178 @@ GoPro Connection Manager - Pure Python Implementation
 Replaces the shell scripts with Python code for better integration
 """
 
+import asyncio
 import subprocess
 import time
 import os
-import json
+import random
+import re
+import shlex
+import shutil
+import socket
 import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from pathlib import Path
 import logging
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+# Re-exported for scripts that imported the download helpers from here
+from gopro_media import download_to_file, json_parser
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Not exported by the socket module on every Python build
+SO_BINDTODEVICE = getattr(socket, "SO_BINDTODEVICE", 25)
+
+# Large receive buffer so the Wi-Fi link, not the socket, limits downloads
+SOCKET_RCVBUF = 2 * 1024 * 1024
+
+# How long an is_gopro_connected() result is reused (seconds)
+CONNECTION_CACHE_TTL = 1.0
+
+# System tools resolved once at startup; sbin dirs are often missing from a user's PATH
+SYSTEM_BINARIES = ("ip", "hciconfig", "wpa_supplicant", "dhclient", "pkill", "rm", "systemctl", "sh", "timeout")
+SYSTEM_PATH = os.pathsep.join([os.environ.get("PATH", ""), "/usr/local/sbin", "/usr/sbin", "/sbin"])
+
+# OS-seeded so retries stay decorrelated across cameras and daemon restarts
+_retry_random = random.SystemRandom()
+
+
+def backoff_delay(attempt, base, cap):
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt))"""
+    return _retry_random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def kill_interface_daemons(interfaces, sudo=("sudo", "-n"), pkill="pkill"):
+    """SIGKILL wpa_supplicant/dhclient instances serving the given interfaces"""
+    # Own pkill calls anchored to the daemon binary - inside an sh -c batch the pattern
+    # would also match the shell's command line and pkill would kill its own parents
+    pattern = "|".join(interfaces)
+    for daemon in ("wpa_supplicant", "dhclient"):
+        subprocess.run(list(sudo) + [pkill, "-9", "-f", f"^([^ ]*/)?{daemon} .*({pattern})"],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+class TokenBucket:
+    """Retry budget: each retry takes a token, tokens refill slowly over time"""
+    
+    def __init__(self, capacity, refill_per_sec):
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def try_acquire(self):
+        """Take one token; False if the budget is exhausted"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_sec)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class InterfaceBoundAdapter(HTTPAdapter):
+    """HTTPAdapter whose sockets are bound to one network interface (like curl --interface)"""
+    
+    def __init__(self, interface, **kwargs):
+        self.interface = interface
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, SO_BINDTODEVICE, self.interface.encode() + b"\0"),
+            (socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_RCVBUF),
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
+
+def create_interface_session(interface, **adapter_kwargs):
+    """Create a keep-alive session whose requests all leave through the given interface"""
+    session = requests.Session()
+    # Only retry failed connects - a shutter command must not be sent twice
+    retry = Retry(total=2, connect=2, read=0, status=0, backoff_factor=0.2)
+    adapter = InterfaceBoundAdapter(interface, max_retries=retry, **adapter_kwargs)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    return session
+
+
+# GoPro BLE command characteristic and the "Wi-Fi AP on" command
+GOPRO_COMMAND_CHAR_UUID = "b5f90072-aa8d-11e3-9046-0002a5d5c51b"
+WIFI_AP_ON_COMMAND = bytes([0x03, 0x17, 0x01, 0x01])
+
+# BleakClients are bound to the loop they connected on, so all BLE work runs on
+# one long-lived loop thread and connected clients are kept per MAC
+_ble_loop = None
+_ble_loop_lock = threading.Lock()
+_ble_clients = {}
+
+
+def _run_ble(coro, timeout):
+    """Run a coroutine on the shared BLE event loop and wait for its result"""
+    global _ble_loop
+    with _ble_loop_lock:
+        if _ble_loop is None:
+            _ble_loop = asyncio.new_event_loop()
+            threading.Thread(target=_ble_loop.run_forever, daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _ble_loop).result(timeout)
+
+
+def _ble_connected(mac):
+    client = _ble_clients.get(mac)
+    return client is not None and client.is_connected
+
+
+async def _wait_advertising(mac, timeout=10):
+    """Return True as soon as the device with this MAC is seen advertising"""
+    # bleak pulls in D-Bus bindings - only load it once BLE is actually needed
+    from bleak import BleakScanner
+    device = await BleakScanner.find_device_by_address(mac, timeout=timeout)
+    return device is not None
+
+
+async def _ble_wifi_on(mac):
+    """Send the Wi-Fi AP on command, reusing the connected client for this MAC"""
+    from bleak import BleakClient
+    client = _ble_clients.get(mac)
+    if client is None or not client.is_connected:
+        client = BleakClient(mac)
+        await client.connect()
+        _ble_clients[mac] = client
+    await client.write_gatt_char(GOPRO_COMMAND_CHAR_UUID, WIFI_AP_ON_COMMAND, response=True)
+
+
+async def _ble_disconnect(mac):
+    client = _ble_clients.pop(mac, None)
+    if client is not None:
+        try:
+            await client.disconnect()
+        except Exception:
+            pass
+
+
+def write_file_atomic(path, content):
+    """Replace path with content via fsync'd temp file + rename, keeping its permissions"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    if os.path.exists(path):
+        shutil.copymode(path, tmp_path)
+    os.replace(tmp_path, path)
+
+
 class GoProConnectionManager:
-    def __init__(self):
+    def __init__(self, use_dhcp=False):
         # GoPro configurations
         self.gopros = {
             "gopro3": {
@@ -40,21 +198,85 @@ class GoProConnectionManager:
         
         # Paths
         self.wpa_conf_dir = "/etc/wpa_supplicant"
-        self.python_bin = "/home/pi/gopro-ble-py/gopro-ble-py/venv/bin/python"
-        self.ble_tool = "/home/pi/gopro-ble-py/gopro-ble-py/main.py"
         
+        # Absolute tool paths; needs NOPASSWD sudoers entries for these binaries
+        self.bins = {name: shutil.which(name, path=SYSTEM_PATH) or name for name in SYSTEM_BINARIES}
+        
+        # GoPro APs always use 10.5.5.0/24, so a static address is assigned directly.
+        # Enable DHCP only for non-standard GoPro networks.
+        self.use_dhcp = use_dhcp
+        
+        # hci0 is shared by all GoPros, so only one BLE activation may run at a time
+        self._ble_lock = threading.Lock()
+        
+        # One persistent HTTP session per GoPro, bound to its interface
+        self.sessions = {
+            gopro_id: create_interface_session(config["interface"])
+            for gopro_id, config in self.gopros.items()
+        }
+        
+        # gopro_id -> (monotonic timestamp, connected) for is_gopro_connected
+        self._conn_cache = {}
+        
+        # wpa_supplicant config path -> (mtime_ns, configured SSIDs)
+        self._wpa_ssids = {}
+        
+        # Per-GoPro retry budget so a camera that is off can't cause endless BLE/HTTP retries
+        self._retry_tokens = {
+            gopro_id: TokenBucket(capacity=10, refill_per_sec=0.1)
+            for gopro_id in self.gopros
+        }
+        
+        # interface name -> kernel ifindex, for interfaces known to exist
+        self._iface_index = {}
+        for config in self.gopros.values():
+            self.interface_exists(config["interface"])
+        
+    def interface_exists(self, interface):
+        """Check whether a network interface exists (libc lookup, cached once found)"""
+        if interface in self._iface_index:
+            return True
+        try:
+            self._iface_index[interface] = socket.if_nametoindex(interface)
+            return True
+        except OSError:
+            return False
+    
+    def _sudo(self, args):
+        """Prefix args with non-interactive sudo - fails fast instead of prompting"""
+        return ["sudo", "-n"] + args
+    
+    def _run_sudo_batch(self, commands, check=False):
+        """Run several root commands in one sudo + sh invocation; only the last one is checked"""
+        script = "; ".join(" ".join(shlex.quote(arg) for arg in cmd) for cmd in commands)
+        return subprocess.run(self._sudo([self.bins["sh"], "-c", script]), check=check, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    
+    def _cleanup_commands(self, interfaces):
+        """Kill wpa_supplicant/dhclient for interfaces; returns the rm command for their control files"""
+        kill_interface_daemons(interfaces, sudo=self._sudo([]), pkill=self.bins["pkill"])
+        return [
+            [self.bins["rm"], "-f"] + [f"/var/run/wpa_supplicant/{interface}" for interface in interfaces],
+        ]
+    
     def reset_bluetooth(self):
         """Reset Bluetooth adapter"""
         try:
             logger.info("Resetting Bluetooth adapter...")
-            subprocess.run(["sudo", "hciconfig", "hci0", "down"], check=True, capture_output=True)
-            subprocess.run(["sudo", "hciconfig", "hci0", "up"], check=True, capture_output=True)
+            subprocess.run(self._sudo([self.bins["hciconfig"], "hci0", "down"]), check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            subprocess.run(self._sudo([self.bins["hciconfig"], "hci0", "up"]), check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             time.sleep(3)
             return True
         except subprocess.CalledProcessError as e:
             logger.error(f"Failed to reset Bluetooth: {e}")
             return False
     
+    def _forget_ble_client(self, mac):
+        """Disconnect and drop the cached BLE client so the next attempt reconnects"""
+        try:
+            _run_ble(_ble_disconnect(mac), timeout=10)
+        except Exception as e:
+            logger.debug(f"BLE disconnect of {mac} failed: {e}")
+    
     def activate_gopro_wifi_ble(self, gopro_id, max_retries=3):
         """Activate GoPro Wi-Fi via BLE with retries"""
         config = self.gopros[gopro_id]
@@ -63,71 +285,79 @@ class GoProConnectionManager:
         
         logger.info(f"Activating {name} Wi-Fi via BLE...")
         
-        for attempt in range(1, max_retries + 1):
-            logger.info(f"BLE attempt {attempt}/{max_retries} for {name}...")
-            
-            try:
-                # Wait for BLE advertising
-                time.sleep(8)
+        with self._ble_lock:
+            for attempt in range(1, max_retries + 1):
+                logger.info(f"BLE attempt {attempt}/{max_retries} for {name}...")
                 
-                # Execute BLE command
-                result = subprocess.run([
-                    self.python_bin, self.ble_tool,
-                    "--interactive", "true",
-                    "--address", mac,
-                    "--command", "wifi on"
-                ], timeout=30, capture_output=True, text=True)
-                
-                if result.returncode == 0:
+                try:
+                    # Wait for BLE advertising (a connected GoPro does not advertise)
+                    if not _ble_connected(mac) and not _run_ble(_wait_advertising(mac), timeout=15):
+                        logger.warning(f"{name} not seen advertising, trying BLE command anyway...")
+                    
+                    # Execute BLE command
+                    _run_ble(_ble_wifi_on(mac), timeout=30)
                     logger.info(f"BLE command succeeded for {name}")
                     return True
-                else:
-                    logger.warning(f"BLE attempt {attempt} failed for {name}: {result.stderr}")
-                    
-            except subprocess.TimeoutExpired:
-                logger.warning(f"BLE attempt {attempt} timed out for {name}")
-            except Exception as e:
-                logger.warning(f"BLE attempt {attempt} error for {name}: {e}")
+                        
+                except FutureTimeoutError:
+                    logger.warning(f"BLE attempt {attempt} timed out for {name}")
+                    self._forget_ble_client(mac)
+                except Exception as e:
+                    logger.warning(f"BLE attempt {attempt} error for {name}: {e}")
+                    self._forget_ble_client(mac)
+                
+                if attempt < max_retries:
+                    if not self._retry_tokens[gopro_id].try_acquire():
+                        logger.warning(f"Retry budget exhausted for {name}, giving up")
+                        break
+                    delay = backoff_delay(attempt, base=2, cap=30)
+                    logger.info(f"Waiting {delay:.1f} seconds before retry...")
+                    time.sleep(delay)
+                    self.reset_bluetooth()
             
-            if attempt < max_retries:
-                logger.info("Waiting 5 seconds before retry...")
-                time.sleep(5)
-                self.reset_bluetooth()
-        
-        logger.error(f"All BLE attempts failed for {name}")
-        return False
+            logger.error(f"All BLE attempts failed for {name}")
+            return False
     
     def create_wpa_supplicant_config(self, interface, ssid, psk):
         """Create or update wpa_supplicant configuration"""
         config_file = os.path.join(self.wpa_conf_dir, f"wpa_supplicant_{interface}.conf")
         
         try:
-            # Create base config if it doesn't exist
-            if not os.path.exists(config_file):
+            try:
+                mtime = os.stat(config_file).st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            
+            # Skip all file I/O if the file is unchanged since we last parsed it
+            cached_mtime, ssids = self._wpa_ssids.get(config_file, (None, set()))
+            if mtime is not None and mtime == cached_mtime and ssid in ssids:
+                return config_file
+            
+            if mtime is None:
                 logger.info(f"Creating {config_file}")
-                base_config = """ctrl_interface=DIR=/var/run/wpa_supplicant GROUP=netdev
+                content = """ctrl_interface=DIR=/var/run/wpa_supplicant GROUP=netdev
 update_config=1
 country=DE
 """
-                with open(config_file, 'w') as f:
-                    f.write(base_config)
+            else:
+                with open(config_file, 'r') as f:
+                    content = f.read()
             
             # Check if network already exists
-            with open(config_file, 'r') as f:
-                content = f.read()
-            
-            if f'ssid="{ssid}"' not in content:
+            ssids = set(re.findall(r'ssid="([^"]+)"', content))
+            if ssid not in ssids:
                 logger.info(f"Adding {ssid} to {config_file}")
-                network_block = f"""
+                content += f"""
 network={{
     ssid="{ssid}"
     psk="{psk}"
     key_mgmt=WPA-PSK
 }}
 """
-                with open(config_file, 'a') as f:
-                    f.write(network_block)
+                write_file_atomic(config_file, content)
+                ssids.add(ssid)
             
+            self._wpa_ssids[config_file] = (os.stat(config_file).st_mtime_ns, ssids)
             return config_file
             
         except Exception as e:
@@ -139,22 +369,13 @@ network={{
         try:
             logger.info(f"Resetting network interface {interface}...")
             
-            # Kill existing processes for this interface
-            subprocess.run(["sudo", "pkill", "-9", "-f", f"wpa_supplicant.*{interface}"], 
-                         capture_output=True)
-            subprocess.run(["sudo", "pkill", "-9", "-f", f"dhclient.*{interface}"], 
-                         capture_output=True)
-            
-            # Remove control interface file
-            control_file = f"/var/run/wpa_supplicant/{interface}"
-            if os.path.exists(control_file):
-                subprocess.run(["sudo", "rm", "-f", control_file], capture_output=True)
-            
-            # Reset interface
-            subprocess.run(["sudo", "ip", "link", "set", interface, "down"], check=True)
-            subprocess.run(["sudo", "ip", "addr", "flush", "dev", interface], capture_output=True)
+            # Kill existing processes, remove the control file and take the interface down
+            self._run_sudo_batch(self._cleanup_commands([interface]) + [
+                [self.bins["ip"], "addr", "flush", "dev", interface],
+                [self.bins["ip"], "link", "set", interface, "down"],
+            ], check=True)
             time.sleep(2)
-            subprocess.run(["sudo", "ip", "link", "set", interface, "up"], check=True)
+            subprocess.run(self._sudo([self.bins["ip"], "link", "set", interface, "up"]), check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             time.sleep(3)
             
             return True
@@ -163,24 +384,42 @@ network={{
             logger.error(f"Failed to reset interface {interface}: {e}")
             return False
     
+    def wait_for_association(self, interface, timeout=10, poll_interval=0.2):
+        """Wait until the interface's operstate reports the link as up"""
+        operstate_file = f"/sys/class/net/{interface}/operstate"
+        deadline = time.monotonic() + timeout
+        
+        while time.monotonic() < deadline:
+            try:
+                with open(operstate_file) as f:
+                    if f.read().strip() == "up":
+                        return True
+            except OSError:
+                pass
+            time.sleep(poll_interval)
+        
+        return False
+    
     def connect_wifi(self, interface, config_file):
         """Connect to Wi-Fi using wpa_supplicant"""
         try:
             logger.info(f"Starting wpa_supplicant for {interface}...")
             
             # Start wpa_supplicant
-            subprocess.run([
-                "sudo", "wpa_supplicant", "-B", "-i", interface, "-c", config_file
-            ], check=True, capture_output=True)
+            subprocess.run(self._sudo([
+                self.bins["wpa_supplicant"], "-B", "-i", interface, "-c", config_file
+            ]), check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             
             # Wait for connection
-            time.sleep(5)
+            if not self.wait_for_association(interface):
+                logger.warning(f"{interface} not associated after 10s, continuing anyway...")
             
             # Request DHCP lease
-            logger.info(f"Requesting DHCP lease for {interface}...")
-            result = subprocess.run([
-                "timeout", "15", "sudo", "dhclient", interface
-            ], capture_output=True)
+            if self.use_dhcp:
+                logger.info(f"Requesting DHCP lease for {interface}...")
+                subprocess.run([self.bins["timeout"], "15"] + self._sudo([
+                    self.bins["dhclient"], interface
+                ]), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             
             return True
             
@@ -189,33 +428,41 @@ network={{
             return False
     
     def assign_static_ip(self, interface, ip_suffix):
-        """Assign static IP if DHCP fails"""
+        """Assign static IP unless the interface already has a GoPro address"""
         try:
             # Check if we got an IP
             result = subprocess.run([
-                "ip", "addr", "show", interface
-            ], capture_output=True, text=True)
+                self.bins["ip"], "-4", "-o", "addr", "show", "dev", interface
+            ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
             
             if "inet 10.5.5." not in result.stdout:
-                logger.info(f"DHCP failed for {interface}, assigning static IP...")
+                logger.info(f"No GoPro address on {interface}, assigning static IP...")
                 static_ip = f"10.5.5.{ip_suffix}/24"
-                subprocess.run([
-                    "sudo", "ip", "addr", "add", static_ip, "dev", interface
-                ], check=True)
+                subprocess.run(self._sudo([
+                    self.bins["ip"], "addr", "add", static_ip, "dev", interface
+                ]), check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
                 return True
             
             return True
             
         except subprocess.CalledProcessError as e:
             logger.error(f"Failed to assign static IP to {interface}: {e}")
-            return False
+            if self.use_dhcp:
+                return False
+            
+            # Static address conflicts - fall back to DHCP
+            logger.info(f"Requesting DHCP lease for {interface}...")
+            result = subprocess.run([self.bins["timeout"], "15"] + self._sudo([
+                self.bins["dhclient"], interface
+            ]), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return result.returncode == 0
     
     def add_route(self, interface, target_ip):
         """Add route to GoPro"""
         try:
-            subprocess.run([
-                "sudo", "ip", "route", "replace", f"{target_ip}/32", "dev", interface
-            ], capture_output=True)
+            subprocess.run(self._sudo([
+                self.bins["ip"], "route", "replace", f"{target_ip}/32", "dev", interface
+            ]), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             return True
         except:
             return False
@@ -224,38 +471,32 @@ network={{
         """Test GoPro HTTP API connection"""
         config = self.gopros[gopro_id]
         ip = config["ip"]
-        interface = config["interface"]
         name = config["name"]
+        session = self.sessions[gopro_id]
         
         try:
-            # Use requests with a custom adapter for interface binding
-            session = requests.Session()
-            
-            # For interface binding, we'll use curl as it's more reliable
-            # In production, you might want to use a library like requests-unixsocket
-            # or configure routing tables differently
-            
             for attempt in range(1, 6):
                 try:
-                    result = subprocess.run([
-                        "curl", "-m", str(timeout), "--interface", interface,
-                        "-s", "-o", "/dev/null", "-w", "%{http_code}",
-                        f"http://{ip}/gp/gpControl/status"
-                    ], capture_output=True, text=True, timeout=timeout+5)
+                    response = session.get(f"http://{ip}/gp/gpControl/status", timeout=timeout)
                     
-                    if result.stdout.strip() == "200":
+                    if response.status_code == 200:
                         logger.info(f"Success: {name} API reachable with HTTP 200")
                         return True
                     else:
-                        logger.warning(f"Attempt {attempt}/5: HTTP={result.stdout.strip()}, retrying...")
+                        logger.warning(f"Attempt {attempt}/5: HTTP={response.status_code}, retrying...")
                         
-                except subprocess.TimeoutExpired:
+                except requests.Timeout:
                     logger.warning(f"Attempt {attempt}/5: Timeout, retrying...")
+                except requests.RequestException as e:
+                    logger.warning(f"Attempt {attempt}/5: {e}, retrying...")
                 
                 if attempt < 5:
-                    time.sleep(3)
+                    if not self._retry_tokens[gopro_id].try_acquire():
+                        logger.warning(f"Retry budget exhausted for {name}, giving up")
+                        break
+                    time.sleep(backoff_delay(attempt, base=1, cap=10))
             
-            logger.error(f"{name} connection failed after 5 attempts")
+            logger.error(f"{name} connection failed after {attempt} attempts")
             return False
             
         except Exception as e:
@@ -271,8 +512,7 @@ network={{
         logger.info(f"=== Connecting to {name} only ===")
         
         # Check if interface exists
-        result = subprocess.run(["ip", "link", "show", interface], capture_output=True)
-        if result.returncode != 0:
+        if not self.interface_exists(interface):
             logger.error(f"Interface {interface} not found")
             return False
         
@@ -284,6 +524,17 @@ network={{
         if not self.reset_network_interface(interface):
             return False
         
+        return self._connect_prepared_gopro(gopro_id)
+    
+    def _connect_prepared_gopro(self, gopro_id):
+        """Connect a GoPro whose Bluetooth adapter and interface are already reset"""
+        config = self.gopros[gopro_id]
+        interface = config["interface"]
+        name = config["name"]
+        
+        # Connection state is about to change
+        self._conn_cache.pop(gopro_id, None)
+        
         # Activate GoPro Wi-Fi via BLE
         if not self.activate_gopro_wifi_ble(gopro_id):
             return False
@@ -314,52 +565,50 @@ network={{
         # Test connection
         return self.test_gopro_connection(gopro_id)
     
-    def connect_dual_gopros_sequential(self):
-        """Connect to both GoPros sequentially"""
-        logger.info("Starting SEQUENTIAL dual GoPro connection process...")
+    def connect_dual_gopros(self):
+        """Connect to both GoPros in parallel after a shared reset"""
+        logger.info("Starting PARALLEL dual GoPro connection process...")
         
         # Check if both interfaces exist
         for gopro_id, config in self.gopros.items():
             interface = config["interface"]
-            result = subprocess.run(["ip", "link", "show", interface], capture_output=True)
-            if result.returncode != 0:
+            if not self.interface_exists(interface):
                 logger.error(f"Interface {interface} not found for {config['name']}")
                 return False
         
-        # Clean up existing processes
+        # Clean up existing processes and control interface files
         logger.info("Cleaning up existing network processes...")
-        subprocess.run(["sudo", "pkill", "-9", "-f", "wpa_supplicant.*wlan"], capture_output=True)
-        subprocess.run(["sudo", "pkill", "-9", "-f", "dhclient.*wlan"], capture_output=True)
-        
-        # Clean up control interface files
-        for interface in ["wlan0", "wlan1"]:
-            control_file = f"/var/run/wpa_supplicant/{interface}"
-            subprocess.run(["sudo", "rm", "-f", control_file], capture_output=True)
+        interfaces = ["wlan0", "wlan1"]
+        self._run_sudo_batch(self._cleanup_commands(interfaces))
         
         # Reset Bluetooth
         logger.info("Resetting Bluetooth to clear stuck connections...")
-        subprocess.run(["sudo", "systemctl", "restart", "bluetooth"], capture_output=True)
+        subprocess.run(self._sudo([self.bins["systemctl"], "restart", "bluetooth"]), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         time.sleep(3)
         
         # Reset both interfaces
-        for interface in ["wlan0", "wlan1"]:
-            subprocess.run(["sudo", "ip", "link", "set", interface, "down"], capture_output=True)
+        self._run_sudo_batch(
+            [[self.bins["ip"], "link", "set", interface, "down"] for interface in interfaces]
+            + [[self.bins["ip"], "addr", "flush", "dev", interface] for interface in interfaces]
+        )
         time.sleep(2)
-        for interface in ["wlan0", "wlan1"]:
-            subprocess.run(["sudo", "ip", "link", "set", interface, "up"], capture_output=True)
+        self._run_sudo_batch([[self.bins["ip"], "link", "set", interface, "up"] for interface in interfaces])
         time.sleep(3)
         
-        # Connect GoPros sequentially
-        results = {}
-        
-        # First GoPro3
-        logger.info("STEP 1: Connecting to GoPro3 first...")
-        results["gopro3"] = self.connect_single_gopro("gopro3")
-        
-        # Then GoPro1
-        logger.info("STEP 2: Now connecting to GoPro1...")
-        time.sleep(3)  # Small delay between connections
-        results["gopro1"] = self.connect_single_gopro("gopro1")
+        # Connect GoPros in parallel - only the BLE step is serialized
+        logger.info("Connecting to GoPro3 and GoPro1 in parallel...")
+        with ThreadPoolExecutor(max_workers=len(self.gopros)) as executor:
+            futures = {
+                gopro_id: executor.submit(self._connect_prepared_gopro, gopro_id)
+                for gopro_id in self.gopros
+            }
+            results = {}
+            for gopro_id, future in futures.items():
+                try:
+                    results[gopro_id] = future.result()
+                except Exception as e:
+                    logger.error(f"Error connecting {self.gopros[gopro_id]['name']}: {e}")
+                    results[gopro_id] = False
         
         # Report results
         logger.info("=== CONNECTION SUMMARY ===")
@@ -380,28 +629,33 @@ network={{
             logger.error("FAILURE: Both GoPro connections failed")
             return False
     
+    # Old name, kept for existing callers
+    connect_dual_gopros_sequential = connect_dual_gopros
+    
     def is_gopro_connected(self, gopro_id, timeout=2):
         """Check if a specific GoPro is connected"""
         config = self.gopros[gopro_id]
         ip = config["ip"]
         interface = config["interface"]
-        name = config["name"]
+        
+        cached_at, cached_result = self._conn_cache.get(gopro_id, (0, None))
+        if time.monotonic() - cached_at < CONNECTION_CACHE_TTL:
+            return cached_result
         
         try:
-            result = subprocess.run([
-                "curl", f"-m{timeout}", "--interface", interface,
-                "-s", "-o", "/dev/null", "-w", "%{http_code}",
-                f"http://{ip}/gp/gpControl/status"
-            ], capture_output=True, text=True)
+            response = self.sessions[gopro_id].get(
+                f"http://{ip}/gp/gpControl/status", timeout=timeout
+            )
             
-            is_connected = result.stdout.strip() == "200"
-            logger.debug(f"{interface} -> {ip}: HTTP {result.stdout.strip()}, Connected: {is_connected}")
+            is_connected = response.status_code == 200
+            logger.debug(f"{interface} -> {ip}: HTTP {response.status_code}, Connected: {is_connected}")
             
-            return is_connected
-            
-        except Exception as e:
+        except requests.RequestException as e:
             logger.debug(f"{interface} connection test error: {e}")
-            return False
+            is_connected = False
+        
+        self._conn_cache[gopro_id] = (time.monotonic(), is_connected)
+        return is_connected
     
     def check_all_gopros_connected(self):
         """Check connection status of all GoPros"""
@@ -429,18 +683,16 @@ class GoProHTTPController:
         self.name = name
         self.base_url = f"http://{ip}"
         self.cam_port = 8080
+        self.session = create_interface_session(interface)
     
     def _make_request(self, endpoint, timeout=5):
-        """Make HTTP request using curl with interface binding"""
+        """Make HTTP request over the interface-bound session"""
         try:
             url = f"{self.base_url}{endpoint}"
-            result = subprocess.run([
-                "curl", f"-m{timeout}", "--interface", self.interface,
-                "-s", "-o", "/dev/null", "-w", "%{http_code}", url
-            ], capture_output=True, text=True)
+            response = self.session.get(url, timeout=timeout)
             
-            return result.stdout.strip() == "200"
-        except:
+            return response.status_code == 200
+        except requests.RequestException:
             return False
     
     def start_recording(self):
@@ -454,15 +706,12 @@ class GoProHTTPController:
     def get_media_list(self):
         """Get media list from GoPro"""
         try:
-            result = subprocess.run([
-                "curl", "-m10", "--interface", self.interface,
-                "-s", f"{self.base_url}/gp/gpMediaList"
-            ], capture_output=True, text=True)
+            response = self.session.get(f"{self.base_url}/gp/gpMediaList", timeout=10)
             
-            if result.returncode == 0:
-                return json.loads(result.stdout)
+            if response.status_code == 200:
+                return json_parser.loads(response.content)
             return None
-        except:
+        except (requests.RequestException, ValueError):
             return None
     
     def delete_file(self, filename):
@@ -475,15 +724,11 @@ class GoProHTTPController:
         try:
             camera_url = f"http://{self.ip}:{self.cam_port}/videos/DCIM/100GOPRO/{filename}"
             
-            result = subprocess.run([
-                "curl", "-#", "-m600", "--connect-timeout", "30",
-                "--speed-time", "60", "--speed-limit", "1024",
-                "--interface", self.interface,
-                "-o", local_path, camera_url
-            ], capture_output=False)  # Show progress
+            download_to_file(self.session, camera_url, local_path)
             
-            return result.returncode == 0 and os.path.exists(local_path)
-        except:
+            return os.path.exists(local_path)
+        except (requests.RequestException, OSError) as e:
+            logger.error(f"Download of {filename} from {self.name} failed: {e}")
             return False
 
 
@@ -502,7 +747,7 @@ def integrate_with_main_script():
     
     # Instead of run_connect_script():
     def run_connect_script():
-        return connection_manager.connect_dual_gopros_sequential()
+        return connection_manager.connect_dual_gopros()
     
     # Instead of is_gopro_connected(ip, interface, timeout):
     def is_gopro_connected(gopro_id, timeout=2):
@@ -521,7 +766,7 @@ if __name__ == "__main__":
     # success = manager.connect_single_gopro("gopro3")
     
     # Test dual connection
-    success = manager.connect_dual_gopros_sequential()
+    success = manager.connect_dual_gopros()
     
     if success:
         print("Connection successful!")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+GoPro media helpers - media list parsing and clip downloads
+Shared by the record scripts and the connection manager
+"""
+
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson as json_parser  # C-accelerated, noticeably faster on large media lists
+except ImportError:
+    import json as json_parser
+
+# Download tuning - the Wi-Fi link is the bottleneck, so keep the socket drained
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class ConcurrencyTuner:
+    """Hill-climbs a concurrency level from measured goodput, one measurement per transfer"""
+    
+    def __init__(self, initial, minimum=1, maximum=8, alpha=0.5):
+        self.level = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.alpha = alpha
+        self.step = 1
+        self.rate = None
+        self._lock = threading.Lock()
+    
+    def record(self, nbytes, seconds):
+        """Feed one transfer's size and duration and move the level for the next one"""
+        if nbytes <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            sample = nbytes / seconds
+            if self.rate is None:
+                self.rate = sample
+            else:
+                previous = self.rate
+                self.rate = self.alpha * sample + (1 - self.alpha) * previous
+                if self.rate < previous:
+                    # the last move made things worse - go back the other way
+                    self.step = -self.step
+            self.level = max(self.minimum, min(self.maximum, self.level + self.step))
+
+
+def find_latest_video(media):
+    """Return the newest .mp4 entry of a parsed gpMediaList response, or None"""
+    files = media.get("media", [])[0].get("fs", [])
+    for entry in reversed(files):
+        if entry.get("n", "").lower().endswith(".mp4"):
+            return entry
+    return None
+
+
+def download_to_file(session, url, local_path, timeout=(30, 60)):
+    """Stream url into local_path without a Python-level chunk loop; returns the bytes written"""
+    with session.get(url, stream=True, timeout=timeout) as r:
+        r.raise_for_status()
+        r.raw.decode_content = True
+        with open(local_path, "wb", buffering=0) as f:
+            shutil.copyfileobj(r.raw, f, DOWNLOAD_CHUNK_SIZE)
+            written = f.tell()
+            # Clips are not read back - don't let them evict the Pi's page cache
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        expected = r.headers.get("Content-Length")
+        if expected is not None and "Content-Encoding" not in r.headers and written != int(expected):
+            raise IOError(f"Truncated download: got {written} of {expected} bytes")
+    return written
+
+
+def download_ranged(session, url, local_path, parts, timeout=10):
+    """Fetch url as parallel HTTP Range requests; returns the size, or 0 if ranges are unsupported"""
+    # Only pays off when the camera caps throughput per request, not per link
+    head = session.head(url, timeout=timeout)
+    if not head.ok:
+        # some firmware rejects HEAD on clips - let the caller stream it in one request
+        return 0
+    size = int(head.headers.get("Content-Length", 0))
+    if head.headers.get("Accept-Ranges") != "bytes" or size < parts:
+        return 0
+    
+    step = -(-size // parts)
+    ranges = [(start, min(start + step, size) - 1) for start in range(0, size, step)]
+    
+    def fetch_range(byte_range):
+        start, end = byte_range
+        headers = {"Range": f"bytes={start}-{end}"}
+        with session.get(url, headers=headers, stream=True, timeout=timeout) as r:
+            if r.status_code != 206:
+                raise RuntimeError(f"Range request returned HTTP {r.status_code}")
+            offset = start
+            for chunk in r.iter_content(chunk_size=None):
+                os.pwrite(fd, chunk, offset)
+                offset += len(chunk)
+        if offset != end + 1:
+            raise RuntimeError(f"Range {start}-{end} ended early at {offset}")
+    
+    fd = os.open(local_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.ftruncate(fd, size)
+        with ThreadPoolExecutor(max_workers=parts) as pool:
+            list(pool.map(fetch_range, ranges))
+        os.fsync(fd)
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+    return size
@@ -1,42 +1,87 @@
 #!/usr/bin/env python3
-import time, os, sys, json, requests, subprocess
+import time, os, sys, requests, threading, queue
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from goprocam import GoProCamera, constants
 import RPi.GPIO as GPIO
-import signal
-import sys
 from pcf8574 import PCF8574
-import asyncio
-from bleak import BleakClient
+from requests.adapters import HTTPAdapter
+from gopro_media import download_to_file, find_latest_video, json_parser
 
 RECORD_SECS    = 5
 FINALIZE_SECS  = 2
 DOWNLOAD_DIR   = "/media/pi/Clips/GoPro_Clips"
 CAM_IP         = "10.5.5.9"
 CAM_PORT       = 8080
+MEDIA_LIST_URL = f"http://{CAM_IP}/gp/gpMediaList"
 LAST_CLIP_FILE = os.path.join(DOWNLOAD_DIR, ".last_clip")  # marker file
-TRIGGER_PIN    = 17
+TRIGGER_PIN    = 17             # BCM pin wired to the PCF8574 INT line (open drain)
 
 I2C_BUS        = 1
 I2C_ADDR_OUTPUT = 0x20
 I2C_ADDR_INPUT = 0x38
 INPUT_PIN      = 0
 OUTPUT_PIN     = 0 
-POLL_INTERVAL  = 0.05
 DEBOUNCE_MS    = 200
+DOWNLOAD_QUEUE_SIZE = 4         # clips allowed to wait for download before triggers block
 
 
 pcf_input = PCF8574(I2C_BUS, I2C_ADDR_INPUT)
 pcf_output = PCF8574(I2C_BUS, I2C_ADDR_OUTPUT)
 
+# GoPro media timestamps: (matches format?, parser) - first match wins
+_TS_PARSERS = [
+    (lambda s: s.endswith("Z"),
+     lambda s: datetime.fromisoformat(s[:-1] + "+00:00")),
+    (lambda s: len(s) >= 19 and s[8] == "T",
+     lambda s: datetime.strptime(s, "%Y%m%dT%H%M%S%z")),
+    (str.isdigit,
+     lambda s: datetime.fromtimestamp(int(s), tz=timezone.utc)),
+]
+
+def parse_clip_timestamp(ts_raw):
+    for matches, parse in _TS_PARSERS:
+        if matches(ts_raw):
+            try:
+                return parse(ts_raw)
+            except (ValueError, OverflowError, OSError):
+                break
+    return datetime.now(timezone.utc)
+
+# shared keep-alive pool for status checks and the download worker
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+trigger_event = threading.Event()
+
+# Downloads run in the background so the next trigger does not wait for Wi-Fi transfer
+download_queue = queue.Queue(maxsize=DOWNLOAD_QUEUE_SIZE)
+download_thread = None
+
+# media list is requested while the camera finalizes; see record_and_fetch()
+media_executor = ThreadPoolExecutor(max_workers=1)
+last_clip_name = None
+
+def on_trigger_interrupt(channel):
+    # INT fires on any port change - confirm the input really went active (LOW)
+    if not pcf_input.port[INPUT_PIN]:
+        trigger_event.set()
+
 def is_gopro_connected(ip=CAM_IP, timeout=2):
     try:
-        response = requests.get(f"http://{ip}/gp/gpControl/status", timeout=timeout)
+        response = session.get(f"http://{ip}/gp/gpControl/status", timeout=timeout)
         return response.status_code == 200
     except requests.RequestException:
         return False
 
+def warm_up_session(ip=CAM_IP, timeout=2):
+    # open the pooled connection now so the first trigger does not pay the TCP handshake
+    try:
+        session.head(f"http://{ip}/gp/gpControl/status", timeout=timeout)
+    except requests.RequestException:
+        pass
+
 def run_connect_script():
+    import subprocess  # only needed when the camera is not already reachable
     script_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "connect_gopro.sh"))
     print(f"[INFO] Running connection script at: {script_path}")
     if not os.path.isfile(script_path):
@@ -50,75 +95,118 @@ def run_connect_script():
 
 
     
-def record_and_fetch():
+def download_clip(camera_url, tmp_name, final_dst):
+    print("[DL] Downloading", os.path.basename(camera_url), "->", final_dst, flush=True)
+    try:
+        download_to_file(session, camera_url, tmp_name, timeout=10)
+    except Exception as e:
+        print("[ERROR] Download failed:", e, flush=True)
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+        return
+
+    os.rename(tmp_name, final_dst)
+    print("[OK] Saved clip to", final_dst, flush=True)
+
+def download_worker():
+    while True:
+        task = download_queue.get()
+        if task is None:  # Poison pill to stop the worker
+            download_queue.task_done()
+            break
+        try:
+            download_clip(*task)
+        except Exception as e:
+            print(f"[ERROR] Download worker: {e}", flush=True)
+        download_queue.task_done()
+
+def start_download_worker():
+    global download_thread
+    if download_thread is None or not download_thread.is_alive():
+        download_thread = threading.Thread(target=download_worker, daemon=True)
+        download_thread.start()
+
+def stop_download_worker():
+    if download_thread and download_thread.is_alive():
+        pending = download_queue.qsize()
+        if pending:
+            print(f"[INFO] Warte auf {pending} ausstehende Downloads...", flush=True)
+        download_queue.put(None)
+        download_thread.join()
+
+def fetch_latest_video():
+    response = session.get(MEDIA_LIST_URL, timeout=5)
+    response.raise_for_status()
+    return find_latest_video(json_parser.loads(response.content))
+
+def ensure_gopro(gp):
+    # reuse the camera object; rebuild it only if the camera stopped answering
+    if gp is not None:
+        try:
+            # getStatus returns "" when the request fails or times out, and raises on a bad response
+            if gp.getStatus(constants.Status.Status, constants.Status.STATUS.Mode) != "":
+                return gp
+            print("[WARN] GoPro antwortet nicht", flush=True)
+        except Exception as e:
+            print(f"[WARN] GoPro antwortet nicht: {e}", flush=True)
+    print("[INFO] Initialisiere GoPro-Objekt...", flush=True)
+    return GoProCamera.GoPro()
+
+def record_and_fetch(gp):
+    global last_clip_name
     # Ausgang setzen für Kamera Start
     pcf_output.port[OUTPUT_PIN] = False
-    gp = GoProCamera.GoPro()
 
     # … your existing setup: mode, FOV, res/fps, zoom, etc. …
 
     # 6) record
     print("[REC] Recording for", RECORD_SECS, "seconds...", flush=True)
     gp.shoot_video(RECORD_SECS)
+    # request the media list on the kept-alive session while we wait
+    media_future = media_executor.submit(fetch_latest_video)
     print("[WAIT] Waiting", FINALIZE_SECS, "seconds...", flush=True)
     time.sleep(FINALIZE_SECS)
 
     # 7) fetch latest clip
-    raw_media = gp.listMedia()
-    media     = json.loads(raw_media)
-    files     = media.get("media", [])[0].get("fs", [])
-    videos    = [f for f in files if f.get("n","").lower().endswith(".mp4")]
-    latest    = videos[-1]
+    try:
+        latest = media_future.result()
+    except Exception:
+        latest = None
+    if latest is None or last_clip_name is None or latest["n"] == last_clip_name:
+        # speculative list was taken before the new clip was finalized, or there is no
+        # known previous clip to tell it apart - ask again now that the wait is over
+        latest = fetch_latest_video()
+    if latest is None:
+        print("[ERROR] No video found on GoPro", flush=True)
+        return
     latest_name = latest["n"]
 
     # parse timestamp (your existing block)
     ts_raw = latest.get("d") or latest.get("mod") or ""
-    dt = None
-    if ts_raw.endswith("Z"):
-        try: dt = datetime.fromisoformat(ts_raw.replace("Z","+00:00"))
-        except: dt = None
-    elif len(ts_raw)>=19 and ts_raw[8]=="T":
-        try: dt = datetime.strptime(ts_raw, "%Y%m%dT%H%M%S%z")
-        except: dt = None
-    elif ts_raw.isdigit():
-        try: dt = datetime.fromtimestamp(int(ts_raw), tz=timezone.utc)
-        except: dt = None
-    if dt is None:
-        dt = datetime.now(timezone.utc)
-    ts = dt.strftime("%Y%m%d_%H%M%S")
+    ts = parse_clip_timestamp(ts_raw).strftime("%Y%m%d_%H%M%S")
 
     # download
     camera_url = f"http://{CAM_IP}:{CAM_PORT}/videos/DCIM/100GOPRO/{latest_name}"
     os.makedirs(DOWNLOAD_DIR, exist_ok=True)
-    tmp_name   = latest_name
     final_dst  = os.path.join(DOWNLOAD_DIR, ts + os.path.splitext(latest_name)[1])
+    tmp_name   = final_dst + ".part"  # same filesystem as final_dst, so the rename is atomic
 
-    print("[DL] Downloading", latest_name, "->", final_dst, flush=True)
-    try:
-        with requests.get(camera_url, stream=True, timeout=10) as r:
-            r.raise_for_status()
-            with open(tmp_name, "wb") as f:
-                for chunk in r.iter_content(chunk_size=1024*1024):
-                    if chunk:
-                        f.write(chunk)
-    except Exception as e:
-        print("[ERROR] Download failed:", e, flush=True)
-        if os.path.exists(tmp_name):
-            os.remove(tmp_name)
-        return
-
-    os.replace(tmp_name, final_dst)
-    print("[OK] Saved clip to", final_dst, flush=True)
+    # blocks only if DOWNLOAD_QUEUE_SIZE clips are already waiting
+    download_queue.put((camera_url, tmp_name, final_dst))
+    last_clip_name = latest_name
+    print("[DL] Queued", latest_name, f"(queue size: {download_queue.qsize()})", flush=True)
     pcf_output.port[OUTPUT_PIN] = True
 
 
 def main():
+    global last_clip_name
     # Initialisierung
     # Ausgang zurücksetzen für Kamera Start
     pcf_output.port[OUTPUT_PIN] = True
     if not is_gopro_connected():
         try:
             run_connect_script()
+            warm_up_session()
         except Exception as e:
             print(f"[ERROR] Failed to connect to GoPro: {e}")
             sys.exit(1)
@@ -126,30 +214,41 @@ def main():
         print("[INFO] GoPro already reachable — skipping connection script.")
 
     
-    print(f"Polling PCF8574@0x{I2C_ADDR_INPUT:02x} P{INPUT_PIN}... (Ctrl-C zum Stop)")
-
+    start_download_worker()
+    gp = ensure_gopro(None)
     try:
-        while True:
-            # 1) wait for any HIGH
-            if not pcf_input.port[INPUT_PIN]:
-                print("\n[TRIGGER] Eingang ist HIGH - starte Aufnahme")
-                try:
-                    record_and_fetch()
-                except Exception as e:
-                    print(f"[ERROR] record_and_fetch fehlgeschlagen: {e}", flush=True)
+        # remember what is already on the card so a stale media list is detected
+        latest = fetch_latest_video()
+        last_clip_name = latest["n"] if latest else None
+    except Exception as e:
+        print(f"[WARN] Medienliste nicht abrufbar: {e}", flush=True)
+
+    GPIO.setmode(GPIO.BCM)
+    GPIO.setup(TRIGGER_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+    GPIO.add_event_detect(TRIGGER_PIN, GPIO.FALLING, callback=on_trigger_interrupt,
+                          bouncetime=DEBOUNCE_MS)
 
-                # 2) Debounce: block until LOW or timeout
-                start = time.time()
-                while pcf_input.port[INPUT_PIN] and (time.time() - start) < (DEBOUNCE_MS/1000):
-                    time.sleep(POLL_INTERVAL)
+    print(f"Warte auf PCF8574@0x{I2C_ADDR_INPUT:02x} P{INPUT_PIN} via INT an GPIO{TRIGGER_PIN}... (Ctrl-C zum Stop)")
 
-                print("[INFO] Debounce vorbei - bereit für nächsten Trigger")
+    try:
+        while True:
+            # 1) sleep until the interrupt reports the input as active
+            trigger_event.wait()
+            print("\n[TRIGGER] Eingang ist HIGH - starte Aufnahme")
+            try:
+                gp = ensure_gopro(gp)
+                record_and_fetch(gp)
+            except Exception as e:
+                print(f"[ERROR] record_and_fetch fehlgeschlagen: {e}", flush=True)
 
-            # 3) small sleep so we don't spin too hard
-            time.sleep(POLL_INTERVAL)
+            # 2) ignore triggers that arrived while recording
+            trigger_event.clear()
+            print("[INFO] Bereit für nächsten Trigger")
 
     except KeyboardInterrupt:
         print("\nAbbruch durch Nutzer, beende...")
+        stop_download_worker()
+        GPIO.cleanup()
         sys.exit(0)
 
 
@@ -1,99 +1,244 @@
 #!/usr/bin/env python3
-import time, os, sys, json, requests, subprocess, threading
+import time, os, sys, requests, threading, shutil, socket, selectors
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pcf8574 import PCF8574
+import RPi.GPIO as GPIO
+from gopro_connection_manager import GoProConnectionManager, create_interface_session, SO_BINDTODEVICE
+from gopro_media import download_ranged
 
 # ==== CONFIG ====
 RECORD_SECS    = 5
-FINALIZE_SECS  = 2
+FINALIZE_TIMEOUT_SECS = 3      # max wait for the new clip to show up in the media list
+MEDIA_POLL_INTERVAL   = 0.2
 DOWNLOAD_DIR   = "/media/pi/Clips/GoPro_Clips"
-TRIGGER_PIN    = 17
+RANGE_DOWNLOAD_PARTS = 4       # parallel HTTP Range requests per clip (<= session pool size); <=1 streams in one request
+CAM_IP         = "10.5.5.9"
+SHUTTER_REQUEST = (f"GET /gp/gpControl/command/shutter?p=1 HTTP/1.0\r\n"
+                   f"Host: {CAM_IP}\r\n\r\n").encode()
+MEDIA_LIST_URL = f"http://{CAM_IP}/gp/gpMediaList"
+VIDEO_URL_TMPL = "http://" + CAM_IP + ":8080/videos/DCIM/100GOPRO/{name}"
+TRIGGER_PIN    = 17             # BCM pin wired to the PCF8574 /INT line (open drain)
 
 I2C_BUS         = 1
 I2C_ADDR_OUTPUT = 0x20
 I2C_ADDR_INPUT  = 0x38
 INPUT_PIN       = 0
 OUTPUT_PIN      = 0
-POLL_INTERVAL   = 0.05
 DEBOUNCE_MS     = 200
+HEALTH_CHECK_SECS = 300        # re-probe the camera when idle this long; reconnect if gone
 
 # ==== INIT ====
 pcf_input  = PCF8574(I2C_BUS, I2C_ADDR_INPUT)
 pcf_output = PCF8574(I2C_BUS, I2C_ADDR_OUTPUT)
+# pcf8574 indexes port[] MSB first, so port[INPUT_PIN] is bit 7 - INPUT_PIN of the raw byte
+INPUT_MASK = 1 << (7 - INPUT_PIN)
 
-def is_gopro_connected(ip="10.5.5.9", timeout=2):
+# One keep-alive session per camera, bound to its interface like curl --interface
+SESSIONS = {
+    interface: create_interface_session(interface, pool_connections=2, pool_maxsize=4)
+    for interface in ("wlan0", "wlan1")
+}
+
+# Reused for shutter presses and downloads - one worker per camera
+camera_pool = ThreadPoolExecutor(max_workers=2)
+
+# Kept for the life of the process so reconnects reuse its sessions and BLE clients
+connection_manager = None
+
+# Newest clip name seen per camera
+LAST_SEEN = {"wlan0": None, "wlan1": None}
+
+# Set from the /INT edge callback, main thread sleeps on it
+trigger_event = threading.Event()
+
+def input_active():
+    # one I2C byte read for the whole port; every pcf_input.port[...] access reads it again
+    return not (pcf_input.bus.read_byte(I2C_ADDR_INPUT) & INPUT_MASK)
+
+def on_trigger_interrupt(channel):
+    # /INT fires on any port change - only wake the main loop if our input went active
+    if input_active():
+        trigger_event.set()
+
+def is_gopro_connected(session, ip=CAM_IP, timeout=2):
+    # probing through the shared session leaves a warm connection for the next request
     try:
-        response = requests.get(f"http://{ip}/gp/gpControl/status", timeout=timeout)
+        response = session.get(f"http://{ip}/gp/gpControl/status", timeout=timeout)
         return response.status_code == 200
     except requests.RequestException:
         return False
 
 def run_connect_script():
-    script_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "connect_gopro.sh"))
-    print(f"[INFO] Running connection script at: {script_path}")
-    if not os.path.isfile(script_path):
-        raise FileNotFoundError(f"[ERROR] Script not found at {script_path}")
-    result = subprocess.run(["bash", script_path], capture_output=True, text=True)
-    print(result.stdout)
-    if result.returncode != 0:
-        print(result.stderr)
-        raise RuntimeError("Connection script failed")
+    global connection_manager
+    if connection_manager is None:
+        connection_manager = GoProConnectionManager()
+    print("[INFO] Connecting both GoPros in-process...")
+    if not connection_manager.connect_dual_gopros():
+        raise RuntimeError("Connection to GoPros failed")
 
 # ==== Dual Camera Trigger ====
-def start_dual_recording():
-    def trigger_cam(interface):
-        try:
-            print(f"[INFO] Triggering shutter on {interface}...")
-            subprocess.run([
-                "curl", "--interface", interface,
-                "http://10.5.5.9/gp/gpControl/command/shutter?p=1"
-            ], timeout=3)
-        except Exception as e:
-            print(f"[ERROR] Trigger failed on {interface}: {e}")
+def send_shutter_all(interfaces=("wlan0", "wlan1"), timeout=3):
+    # one thread, one selector: connect both cameras first, then send both
+    # requests back-to-back so the shutter skew is microseconds, not thread start-up
+    sel = selectors.DefaultSelector()
+    socks = []
+    results = {interface: False for interface in interfaces}
+    deadline = time.monotonic() + timeout
+    try:
+        for interface in interfaces:
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            socks.append(s)
+            try:
+                s.setsockopt(socket.SOL_SOCKET, SO_BINDTODEVICE, interface.encode() + b"\0")
+                s.setblocking(False)
+                s.connect_ex((CAM_IP, 80))
+            except OSError as e:
+                # e.g. dongle unplugged (ENODEV) - the other camera still gets its press
+                print(f"[ERROR] Trigger failed on {interface}: {e}")
+                continue
+            sel.register(s, selectors.EVENT_WRITE, interface)
+
+        connected = []
+        while sel.get_map() and time.monotonic() < deadline:
+            for key, _ in sel.select(deadline - time.monotonic()):
+                sel.unregister(key.fileobj)
+                err = key.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                if err:
+                    print(f"[ERROR] Trigger failed on {key.data}: {os.strerror(err)}")
+                else:
+                    connected.append(key)
+
+        for key in connected:
+            try:
+                key.fileobj.send(SHUTTER_REQUEST)
+            except OSError as e:
+                print(f"[ERROR] Trigger failed on {key.data}: {e}")
+                continue
+            sel.register(key.fileobj, selectors.EVENT_READ, [key.data, b""])
+
+        while sel.get_map() and time.monotonic() < deadline:
+            for key, _ in sel.select(deadline - time.monotonic()):
+                interface, buf = key.data
+                try:
+                    data = key.fileobj.recv(4096)
+                except OSError:
+                    data = b""
+                buf += data
+                key.data[1] = buf
+                if not data or b"\r\n" in buf:
+                    sel.unregister(key.fileobj)
+                    results[interface] = buf.split(b" ", 2)[1:2] == [b"200"]
+
+        for interface, ok in results.items():
+            if not ok:
+                print(f"[ERROR] Trigger failed on {interface}")
+        return results
+    finally:
+        sel.close()
+        for s in socks:
+            s.close()
 
-    t1 = threading.Thread(target=trigger_cam, args=("wlan0",))
-    t2 = threading.Thread(target=trigger_cam, args=("wlan1",))
-    t1.start()
-    t2.start()
-    t1.join()
-    t2.join()
+def start_dual_recording():
+    print("[INFO] Triggering shutter on wlan0 + wlan1...")
+    send_shutter_all()
 
 # ==== Download from each GoPro ====
-def fetch_latest_clip(interface, name_tag):
-    ip = "10.5.5.9"
-    port = 8080
+def get_latest_video_name(interface):
+    media_resp = SESSIONS[interface].get(MEDIA_LIST_URL, timeout=5)
+    media_resp.raise_for_status()
+    media = media_resp.json()
+    files = media.get("media", [])[0].get("fs", [])
+    # newest clips are at the end - stop at the first .mp4 from the back
+    for entry in reversed(files):
+        name = entry.get("n", "")
+        if name.lower().endswith(".mp4"):
+            return name
+    return None
+
+def warm_video_connection(interface, name):
+    # media list is served on :80, clips on :8080 - open that socket before the clip GET needs it
+    try:
+        SESSIONS[interface].head(VIDEO_URL_TMPL.format(name=name), timeout=2)
+    except requests.RequestException:
+        pass
+
+def wait_for_new_clip(interface, previous_name):
+    # poll instead of sleeping a fixed worst case - the clip usually appears well before
+    deadline = time.monotonic() + FINALIZE_TIMEOUT_SECS
+    warmed = False
+    latest_name = None
+    while True:
+        try:
+            latest_name = get_latest_video_name(interface)
+        except requests.RequestException as e:
+            # camera may drop a request while finalizing - keep polling until the deadline
+            print(f"[WARN] Media list on {interface} failed: {e}")
+        if latest_name is not None and latest_name != previous_name:
+            return latest_name
+        if time.monotonic() >= deadline:
+            print(f"[WARN] No new clip on {interface} after {FINALIZE_TIMEOUT_SECS}s, using latest")
+            return latest_name
+        if not warmed and previous_name:
+            # the camera is still finalizing anyway - spend the wait on the :8080 handshake
+            warm_video_connection(interface, previous_name)
+            warmed = True
+        time.sleep(MEDIA_POLL_INTERVAL)
+
+def snapshot_latest_name(interface):
+    try:
+        return get_latest_video_name(interface)
+    except Exception as e:
+        print(f"[WARN] Media list on {interface} failed: {e}")
+        return LAST_SEEN[interface]
 
+def fetch_latest_clip(interface, name_tag, previous_name=None):
+    tmp_name = None
     try:
         # Get media list
-        media_resp = subprocess.check_output([
-            "curl", "--interface", interface,
-            f"http://{ip}/gp/gpMediaList"
-        ], timeout=5)
-        media = json.loads(media_resp)
-        files = media.get("media", [])[0].get("fs", [])
-        videos = [f for f in files if f.get("n", "").lower().endswith(".mp4")]
-        latest = videos[-1]
-        latest_name = latest["n"]
+        latest_name = wait_for_new_clip(interface, previous_name)
+        if latest_name is None:
+            raise RuntimeError("no video on camera")
+        LAST_SEEN[interface] = latest_name
 
         # Build download path
         ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-        camera_url = f"http://{ip}:{port}/videos/DCIM/100GOPRO/{latest_name}"
-        os.makedirs(DOWNLOAD_DIR, exist_ok=True)
-        tmp_name = f"{name_tag}_{latest_name}"
+        camera_url = VIDEO_URL_TMPL.format(name=latest_name)
+        # hidden .part file on the same filesystem, so os.replace is a plain rename
+        tmp_name = os.path.join(DOWNLOAD_DIR, f".{name_tag}_{latest_name}.part")
         final_dst = os.path.join(DOWNLOAD_DIR, f"{ts}_{name_tag}.mp4")
 
         print(f"[DL-{name_tag}] Downloading {latest_name} -> {final_dst}", flush=True)
-        with requests.get(camera_url, stream=True, timeout=10) as r:
-            r.raise_for_status()
-            with open(tmp_name, "wb") as f:
-                for chunk in r.iter_content(chunk_size=1024*1024):
-                    if chunk:
-                        f.write(chunk)
+        session = SESSIONS[interface]
+        ranged = 0
+        if RANGE_DOWNLOAD_PARTS > 1:
+            try:
+                ranged = download_ranged(session, camera_url, tmp_name, RANGE_DOWNLOAD_PARTS)
+            except (RuntimeError, requests.RequestException) as e:
+                # a range was refused, dropped or cut short - fetch in one stream
+                print(f"[WARN-{name_tag}] Ranged download failed ({e}), retrying as single stream")
+        if not ranged:
+            with session.get(camera_url, stream=True, timeout=10) as r:
+                r.raise_for_status()
+                r.raw.decode_content = True
+                with open(tmp_name, "wb", buffering=4*1024*1024) as f:
+                    if hasattr(os, "posix_fadvise"):
+                        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                    # copy loop runs in C and drops the GIL in read/write, so both cameras overlap
+                    shutil.copyfileobj(r.raw, f, 1024*1024)
+                    f.flush()
+                    os.fsync(f.fileno())
+                    # clip is never read back here - let the kernel drop its pages now
+                    if hasattr(os, "posix_fadvise"):
+                        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
         os.replace(tmp_name, final_dst)
         print(f"[OK-{name_tag}] Saved to {final_dst}")
 
     except Exception as e:
         print(f"[ERROR-{name_tag}] Download failed: {e}")
+        # don't leave a partial clip behind
+        if tmp_name and os.path.exists(tmp_name):
+            os.remove(tmp_name)
 
 # ==== Main Logic ====
 def record_and_fetch():
@@ -101,22 +246,26 @@ def record_and_fetch():
 
     print("[REC] Starting dual-camera recording for", RECORD_SECS, "seconds...", flush=True)
     start_dual_recording()
+    # snapshot the newest clip per camera so the one being recorded is recognised -
+    # fetched during the recording so the stop press is never delayed by it
+    snapshots = [camera_pool.submit(snapshot_latest_name, interface) for interface in ("wlan0", "wlan1")]
     time.sleep(RECORD_SECS)
+
     start_dual_recording()  # stops recording
+    previous_names = [future.result() for future in snapshots]
 
-    print("[WAIT] Waiting", FINALIZE_SECS, "seconds...", flush=True)
-    time.sleep(FINALIZE_SECS)
+    print("[WAIT] Waiting for clips to be finalized...", flush=True)
 
-    # Download from both cameras
-    fetch_latest_clip("wlan0", "cam1")
-    fetch_latest_clip("wlan1", "cam2")
+    # Download from both cameras in parallel - each has its own interface
+    list(camera_pool.map(fetch_latest_clip, ("wlan0", "wlan1"), ("cam1", "cam2"), previous_names))
 
     pcf_output.port[OUTPUT_PIN] = True
 
 def main():
     pcf_output.port[OUTPUT_PIN] = True
+    os.makedirs(DOWNLOAD_DIR, exist_ok=True)
 
-    if not is_gopro_connected():
+    if not is_gopro_connected(SESSIONS["wlan0"]):
         try:
             run_connect_script()
         except Exception as e:
@@ -125,27 +274,43 @@ def main():
     else:
         print("[INFO] GoPro already reachable — skipping connection script.")
 
-    print(f"Polling PCF8574@0x{I2C_ADDR_INPUT:02x} P{INPUT_PIN}... (Ctrl-C to stop)")
+    GPIO.setmode(GPIO.BCM)
+    GPIO.setup(TRIGGER_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+    GPIO.add_event_detect(TRIGGER_PIN, GPIO.FALLING, callback=on_trigger_interrupt,
+                          bouncetime=DEBOUNCE_MS)
+
+    print(f"Waiting for PCF8574@0x{I2C_ADDR_INPUT:02x} P{INPUT_PIN} via /INT on GPIO{TRIGGER_PIN}... (Ctrl-C to stop)")
 
     try:
         while True:
-            if not pcf_input.port[INPUT_PIN]:
-                print("\n[TRIGGER] Input HIGH - starting recording")
-                try:
-                    record_and_fetch()
-                except Exception as e:
-                    print(f"[ERROR] record_and_fetch failed: {e}", flush=True)
+            # sleep without timer wakeups until the callback reports the input as active
+            if not trigger_event.wait(timeout=HEALTH_CHECK_SECS):
+                # idle timeout - make sure the AP did not drop while we were waiting
+                if not is_gopro_connected(SESSIONS["wlan0"]):
+                    print("[WARN] GoPro not reachable - rerunning connection script")
+                    try:
+                        run_connect_script()
+                    except Exception as e:
+                        print(f"[ERROR] Reconnect failed: {e}")
+                continue
 
-                start = time.time()
-                while pcf_input.port[INPUT_PIN] and (time.time() - start) < (DEBOUNCE_MS/1000):
-                    time.sleep(POLL_INTERVAL)
+            print("\n[TRIGGER] Input HIGH - starting recording")
+            try:
+                record_and_fetch()
+            except Exception as e:
+                print(f"[ERROR] record_and_fetch failed: {e}", flush=True)
 
-                print("[INFO] Debounce done - ready for next trigger")
+            # debounce: wait out the window once, then drop edges that came in while recording
+            time.sleep(DEBOUNCE_MS / 1000)
+            trigger_event.clear()
+            if input_active():
+                print("[INFO] Input still active - waiting for the next edge")
 
-            time.sleep(POLL_INTERVAL)
+            print("[INFO] Debounce done - ready for next trigger")
 
     except KeyboardInterrupt:
         print("\nInterrupted by user. Exiting.")
+        GPIO.cleanup()
         sys.exit(0)
 
 if __name__ == "__main__":
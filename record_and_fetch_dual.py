@@ -9,9 +9,13 @@ from pcf8574 import PCF8574
 import asyncio
 from bleak import BleakClient
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import tempfile
-import queue
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+from collections import deque
+from functools import lru_cache
+from gopro_connection_manager import create_interface_session
+from gopro_media import ConcurrencyTuner, download_ranged, download_to_file, find_latest_video, json_parser
 
 RECORD_SECS    = 5
 FINALIZE_SECS  = 2
@@ -19,7 +23,16 @@ DOWNLOAD_DIR   = "/media/usb/GoPro_Clips"
 COMBINED_DIR   = "/media/usb/GoPro_Clips/Combined"
 FALLBACK_DIR   = "/home/pi/GoPro_Clips_Backup"  # Fallback if SSD unavailable
 CAM_PORT       = 8080
-LAST_CLIP_FILE = os.path.join(DOWNLOAD_DIR, ".last_clip")
+SESSION_POOL_SIZE    = 4        # kept-alive connections per camera session
+RANGE_DOWNLOAD_PARTS = 4        # initial parallel HTTP Range requests per clip; <=1 streams in one request
+# more ranges than pooled connections would only queue or open throwaway sockets
+RANGE_DOWNLOAD_MAX_PARTS = SESSION_POOL_SIZE
+
+# Connection scripts live next to this file; resolved once so a cwd change cannot break them
+SCRIPT_DIR            = os.path.dirname(os.path.abspath(__file__))
+CONNECT_SCRIPT        = os.path.join(SCRIPT_DIR, "connect_dual_gopro_sequential.sh")
+CONNECT_SCRIPT_LEGACY = os.path.join(SCRIPT_DIR, "connect_dual_gopro.sh")
+SINGLE_CONNECT_SCRIPT = os.path.join(SCRIPT_DIR, "connect_single_gopro.sh")
 
 # GoPro configurations
 GOPROS = {
@@ -37,32 +50,60 @@ GOPROS = {
     }
 }
 
+# One keep-alive session per interface, bound to it like curl --interface
+SESSIONS = {
+    config["interface"]: create_interface_session(config["interface"], pool_connections=2, pool_maxsize=SESSION_POOL_SIZE)
+    for config in GOPROS.values()
+}
+
+# Newest clip name downloaded per camera, so a stale media list is not fetched twice
+LAST_DOWNLOADED = {}
+
+# Camera commands that can overlap local work (e.g. delete while the metadata is probed)
+control_pool = ThreadPoolExecutor(max_workers=2)
+
+# Free space per path: {path: (monotonic timestamp, GB)}
+SPACE_CACHE_TTL = 5.0
+_space_cache = {}
+
+# Range count per camera, adjusted after every download from the measured throughput
+RANGE_TUNERS = {
+    gopro_id: ConcurrencyTuner(RANGE_DOWNLOAD_PARTS, minimum=2, maximum=RANGE_DOWNLOAD_MAX_PARTS)
+    for gopro_id in GOPROS
+}
+
 # I2C Configuration
 I2C_BUS        = 1
 I2C_ADDR_OUTPUT = 0x20
 I2C_ADDR_INPUT = 0x38
 INPUT_PIN      = 0
 OUTPUT_PIN     = 0 
-POLL_INTERVAL  = 0.05
 DEBOUNCE_MS    = 200
+TRIGGER_PIN    = 17             # BCM pin wired to the PCF8574 /INT line (open drain)
 
-# Global queue for video combination tasks
-combination_queue = queue.Queue()
-combination_thread = None
+# Video combination
+STREAM_MATCH_KEYS = ("codec_name", "width", "height", "r_frame_rate", "sample_rate", "channels")
+HW_ENCODE_BITRATE = "20M"
+
+# Background ffmpeg combinations run in a process pool; futures are kept for status reporting
+combination_pool = None
+combination_futures = deque()
+COMBINE_WORKERS = 2
+COMBINE_CPUS    = {2, 3}  # keep cores 0/1 for the trigger loop, Wi-Fi and downloads
 
 def is_gopro_connected(ip, interface, timeout=2):
     """Check if GoPro is reachable via specific network interface"""
     try:
-        # Use curl with --interface to specify which network interface to use
-        cmd = f"curl -m{timeout} --interface {interface} -s -o /dev/null -w '%{{http_code}}' http://{ip}/gp/gpControl/status"
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        
-        # Debug output
-        if result.returncode != 0:
-            print(f"[DEBUG] {interface} curl failed: {result.stderr.strip()}")
+        # The interface-bound session replaces curl --interface and keeps the socket open
+        try:
+            response = SESSIONS[interface].get(f"http://{ip}/gp/gpControl/status", timeout=timeout)
+            status_code = response.status_code
+        except requests.RequestException as e:
+            print(f"[DEBUG] {interface} request failed: {e}")
+            status_code = None
         
-        is_connected = result.stdout.strip() == "200"
-        print(f"[DEBUG] {interface} -> {ip}: HTTP {result.stdout.strip()}, Connected: {is_connected}")
+        is_connected = status_code == 200
+        print(f"[DEBUG] {interface} -> {ip}: HTTP {status_code}, Connected: {is_connected}")
         
         return is_connected
     except Exception as e:
@@ -71,7 +112,7 @@ def is_gopro_connected(ip, interface, timeout=2):
 
 def run_single_gopro_connect(gopro_id):
     """Connect to a single specific GoPro"""
-    script_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "connect_single_gopro.sh"))
+    script_path = SINGLE_CONNECT_SCRIPT
     if not os.path.isfile(script_path):
         print(f"[WARNING] Single GoPro script not found, using full connection script")
         return run_connect_script()
@@ -96,33 +137,11 @@ def run_single_gopro_connect(gopro_id):
 
 def run_connect_script():
     """Run the sequential dual GoPro connection script with timeout"""
-    script_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "connect_dual_gopro_sequential.sh"))
-    print(f"[INFO] Running sequential connection script at: {script_path}")
-    if not os.path.isfile(script_path):
-        # Fall back to the original script if sequential doesn't exist
-        script_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "connect_dual_gopro.sh"))
-        print(f"[INFO] Sequential script not found, using original at: {script_path}")
-        if not os.path.isfile(script_path):
-            raise FileNotFoundError(f"[ERROR] No connection script found")
-
-    # Don't capture output so we can see what's happening, but add timeout
-    print("[INFO] Running connection script with 4-minute timeout (you may need to enter sudo password)...")
-    print("[INFO] Connecting GoPros one after the other to avoid Bluetooth conflicts...")
-    try:
-        result = subprocess.run(["sudo", "bash", script_path], timeout=240)  # 4 minute timeout for sequential
-        
-        if result.returncode != 0:
-            raise RuntimeError("Dual connection script failed")
-    except subprocess.TimeoutExpired:
-        print("[WARNING] Connection script timed out after 4 minutes")
-        print("[INFO] Checking if GoPros connected anyway...")
-        # Don't raise error - let the connection check determine if it worked
-    """Run the sequential dual GoPro connection script with timeout"""
-    script_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "connect_dual_gopro_sequential.sh"))
+    script_path = CONNECT_SCRIPT
     print(f"[INFO] Running sequential connection script at: {script_path}")
     if not os.path.isfile(script_path):
         # Fall back to the original script if sequential doesn't exist
-        script_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "connect_dual_gopro.sh"))
+        script_path = CONNECT_SCRIPT_LEGACY
         print(f"[INFO] Sequential script not found, using original at: {script_path}")
         if not os.path.isfile(script_path):
             raise FileNotFoundError(f"[ERROR] No connection script found")
@@ -148,6 +167,7 @@ class GoProController:
         self.interface = config["interface"]
         self.name = config["name"]
         self.download_dir = os.path.join(base_download_dir, config["download_subdir"])
+        self.session = SESSIONS[self.interface]
         
     def get_gopro_camera(self):
         """Initialize GoPro camera object with specific IP"""
@@ -155,27 +175,26 @@ class GoProController:
         # For now, we'll use direct HTTP requests
         return None
         
-    def record_video(self, duration):
-        """Start recording on this GoPro"""
+    def start_recording(self):
+        """Press the shutter on this GoPro"""
         try:
-            # Start recording
-            cmd = f"curl -m5 --interface {self.interface} -s http://{self.ip}/gp/gpControl/command/shutter?p=1"
-            result = subprocess.run(cmd, shell=True, capture_output=True)
-            if result.returncode != 0:
+            response = self.session.get(f"http://{self.ip}/gp/gpControl/command/shutter?p=1", timeout=(3, 5))
+            if response.status_code != 200:
                 raise Exception(f"Failed to start recording on {self.name}")
-            
-            print(f"[{self.name}] Recording started for {duration} seconds...")
-            time.sleep(duration)
-            
-            # Stop recording
-            cmd = f"curl -m5 --interface {self.interface} -s http://{self.ip}/gp/gpControl/command/shutter?p=0"
-            result = subprocess.run(cmd, shell=True, capture_output=True)
-            if result.returncode != 0:
+            print(f"[{self.name}] Recording started")
+            return True
+        except Exception as e:
+            print(f"[ERROR] {self.name} recording failed: {e}")
+            return False
+    
+    def stop_recording(self):
+        """Release the shutter on this GoPro"""
+        try:
+            response = self.session.get(f"http://{self.ip}/gp/gpControl/command/shutter?p=0", timeout=(3, 5))
+            if response.status_code != 200:
                 raise Exception(f"Failed to stop recording on {self.name}")
-                
             print(f"[{self.name}] Recording stopped")
             return True
-            
         except Exception as e:
             print(f"[ERROR] {self.name} recording failed: {e}")
             return False
@@ -183,11 +202,11 @@ class GoProController:
     def get_media_list(self):
         """Get media list from GoPro"""
         try:
-            cmd = f"curl -m10 --interface {self.interface} -s http://{self.ip}/gp/gpMediaList"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-            if result.returncode != 0:
+            response = self.session.get(f"http://{self.ip}/gp/gpMediaList", timeout=(3, 10))
+            if response.status_code != 200:
                 raise Exception("Failed to get media list")
-            return json.loads(result.stdout)
+            # parse the raw bytes - orjson when installed, listings get large after a long shoot
+            return json_parser.loads(response.content)
         except Exception as e:
             print(f"[ERROR] {self.name} failed to get media list: {e}")
             return None
@@ -197,10 +216,9 @@ class GoProController:
         try:
             # Use the GoPro HTTP API to delete specific file
             delete_url = f"http://{self.ip}/gp/gpControl/command/storage/delete?p=/100GOPRO/{filename}"
-            cmd = f"curl -m10 --interface {self.interface} -s '{delete_url}'"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+            response = self.session.get(delete_url, timeout=(3, 10))
             
-            if result.returncode == 0:
+            if response.status_code == 200:
                 print(f"[{self.name}] Successfully deleted {filename} from GoPro")
                 return True
             else:
@@ -229,14 +247,16 @@ class GoProController:
             if not media:
                 return False
                 
-            files = media.get("media", [])[0].get("fs", [])
-            videos = [f for f in files if f.get("n", "").lower().endswith(".mp4")]
-            if not videos:
+            latest = find_latest_video(media)
+            if latest is None:
                 print(f"[{self.name}] No videos found")
                 return False
                 
-            latest = videos[-1]
             latest_name = latest["n"]
+            if latest_name == LAST_DOWNLOADED.get(self.gopro_id):
+                # already fetched (its delete must have failed) - the new clip is not listed yet
+                print(f"[{self.name}] Newest clip {latest_name} was already downloaded")
+                return False
             
             # Parse timestamp
             ts_raw = latest.get("d") or latest.get("mod") or ""
@@ -270,26 +290,51 @@ class GoProController:
             # Track download time
             download_start_time = time.time()
             
-            # Use curl with progress and interface specification for download
-            # 10 minute timeout for large files and added connection optimizations
-            cmd = f"curl -# -m600 --connect-timeout 30 --speed-time 60 --speed-limit 1024 --interface {self.interface} -o '{final_dst}' '{camera_url}'"
-            result = subprocess.run(cmd, shell=True)
+            # Stream over the kept-alive session; a 60s read timeout replaces curl's stall detection
+            # and a short read against Content-Length raises instead of leaving a truncated clip.
+            # Written to a hidden .part file and renamed, so a failed transfer never gets the clip name
+            tmp_dst = os.path.join(self.download_dir, f".{ts}_{latest_name}.part")
+            try:
+                downloaded_bytes = 0
+                parts = RANGE_TUNERS[self.gopro_id].level
+                if parts > 1:
+                    try:
+                        downloaded_bytes = download_ranged(self.session, camera_url, tmp_dst,
+                                                           parts, timeout=(30, 60))
+                    except (RuntimeError, requests.RequestException) as e:
+                        # a range was refused, dropped or cut short - fetch in one stream
+                        print(f"[{self.name}] Ranged download failed ({e}), retrying as single stream")
+                ranged = downloaded_bytes > 0
+                if not ranged:
+                    downloaded_bytes = download_to_file(self.session, camera_url, tmp_dst, timeout=(30, 60))
+                os.replace(tmp_dst, final_dst)
+                download_ok = True
+            except (requests.RequestException, OSError) as e:
+                print(f"[{self.name}] Download error: {e}")
+                download_ok = False
             
             download_end_time = time.time()
             download_time_sec = download_end_time - download_start_time
             
-            if result.returncode == 0 and os.path.exists(final_dst):
-                file_size_mb = os.path.getsize(final_dst) / (1024*1024)
+            if download_ok and os.path.exists(final_dst):
+                file_size_mb = downloaded_bytes / (1024*1024)
                 print(f"[{self.name}] Successfully saved {file_size_mb:.1f}MB to {final_dst}")
                 print(f"[{self.name}] Download completed in {download_time_sec:.1f} seconds")
+                if ranged:
+                    # a single-stream fallback says nothing about the range count
+                    RANGE_TUNERS[self.gopro_id].record(downloaded_bytes, download_time_sec)
+                consume_cached_space(self.download_dir, downloaded_bytes)
                 
                 # Verify file integrity (basic check - file size > 0 and reasonable)
                 if file_size_mb > 0.1:  # At least 100KB (very conservative)
+                    # File downloaded successfully - delete it from the GoPro while ffprobe runs locally
+                    delete_future = control_pool.submit(self.delete_file_from_gopro, latest_name)
+                    
                     # Create metadata file
                     create_metadata_file(final_dst, download_time_sec=download_time_sec, file_size_mb=file_size_mb)
                     
-                    # File downloaded successfully, now delete from GoPro
-                    if self.delete_file_from_gopro(latest_name):
+                    LAST_DOWNLOADED[self.gopro_id] = latest_name
+                    if delete_future.result():
                         print(f"[{self.name}] File cleanup completed - removed from GoPro storage")
                     else:
                         print(f"[{self.name}] Warning: Download successful but failed to delete from GoPro")
@@ -302,8 +347,8 @@ class GoProController:
             else:
                 print(f"[{self.name}] Download failed (took {download_time_sec:.1f} seconds)")
                 # Clean up partial download
-                if os.path.exists(final_dst):
-                    os.remove(final_dst)
+                if os.path.exists(tmp_dst):
+                    os.remove(tmp_dst)
                 return False
                 
         except Exception as e:
@@ -338,7 +383,8 @@ def check_storage_availability():
     except Exception as e:
         print(f"[WARNING] Error checking external SSD: {e}")
     
-    # Fallback to local storage
+    # Fallback to local storage - the SSD is gone, so cached free-space values are stale
+    invalidate_space_cache()
     print(f"[INFO] Using fallback storage: {FALLBACK_DIR}")
     fallback_combined = os.path.join(FALLBACK_DIR, "Combined")
     os.makedirs(FALLBACK_DIR, exist_ok=True)
@@ -348,87 +394,112 @@ def check_storage_availability():
 pcf_input = PCF8574(I2C_BUS, I2C_ADDR_INPUT)
 pcf_output = PCF8574(I2C_BUS, I2C_ADDR_OUTPUT)
 
-def video_combination_worker():
-    """Background worker thread for combining videos"""
-    global combination_queue
-    
-    print("[COMBINE_WORKER] Video combination worker started")
-    
-    while True:
-        try:
-            # Get the next combination task from queue (blocks if empty)
-            task = combination_queue.get(timeout=1)
-            
-            if task is None:  # Poison pill to stop the worker
-                print("[COMBINE_WORKER] Worker received stop signal")
-                break
-                
-            video1_path, video2_path, output_path, timestamp = task
-            
-            print(f"[COMBINE_WORKER] Starting background combination: {os.path.basename(video1_path)} + {os.path.basename(video2_path)}")
-            
-            success = combine_videos(video1_path, video2_path, output_path, timestamp)
-            
-            if success:
-                combined_size_mb = os.path.getsize(output_path) / (1024*1024)
-                print(f"[COMBINE_WORKER] Background combination completed: {output_path} ({combined_size_mb:.1f}MB)")
-            else:
-                print(f"[COMBINE_WORKER] Background combination failed for {output_path}")
-            
-            # Mark task as done
-            combination_queue.task_done()
-            
-        except queue.Empty:
-            # No tasks in queue, continue waiting
-            continue
-        except Exception as e:
-            print(f"[COMBINE_WORKER] Error in combination worker: {e}")
-            combination_queue.task_done()
+# Set from the /INT edge callback, main loop sleeps on it
+trigger_event = threading.Event()
+
+def on_trigger_interrupt(channel):
+    """/INT fires on any port change - wake the main loop only if our input went active"""
+    if not pcf_input.port[INPUT_PIN]:
+        trigger_event.set()
+
+def _pin_combination_worker():
+    """Pin a combination worker (and the ffmpeg it spawns) to the reserved cores"""
+    cpus = COMBINE_CPUS & os.sched_getaffinity(0)
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+
+def _new_combination_pool():
+    """Process pool for ffmpeg jobs"""
+    # forkserver: workers start lazily on the first submit, when the control_pool and GPIO
+    # threads exist - a plain fork could inherit a lock (stdout, logging) held by one of them
+    return ProcessPoolExecutor(max_workers=COMBINE_WORKERS, initializer=_pin_combination_worker,
+                               mp_context=multiprocessing.get_context("forkserver"))
 
 def start_combination_worker():
-    """Start the background video combination worker thread"""
-    global combination_thread
+    """Start the background video combination worker processes"""
+    global combination_pool
     
-    if combination_thread is None or not combination_thread.is_alive():
-        combination_thread = threading.Thread(target=video_combination_worker, daemon=True)
-        combination_thread.start()
-        print("[INFO] Background video combination worker started")
+    if combination_pool is None:
+        combination_pool = _new_combination_pool()
+        print(f"[INFO] Background video combination workers started ({COMBINE_WORKERS} processes)")
 
 def stop_combination_worker():
-    """Stop the background video combination worker thread"""
-    global combination_queue, combination_thread
+    """Stop the background video combination worker processes"""
+    global combination_pool
     
-    if combination_thread and combination_thread.is_alive():
-        # Send poison pill to stop worker
-        combination_queue.put(None)
-        combination_thread.join(timeout=5)
-        print("[INFO] Background video combination worker stopped")
+    if combination_pool is not None:
+        # drop combinations that have not started; running ffmpeg jobs finish on their own
+        combination_pool.shutdown(wait=False, cancel_futures=True)
+        combination_pool = None
+        print("[INFO] Background video combination workers stopped")
+
+def _report_combination(future, output_path):
+    """Log the outcome of a finished combination"""
+    try:
+        success = future.result()
+    except Exception as e:
+        print(f"[COMBINE_WORKER] Error in combination worker: {e}")
+        return
+    if success:
+        combined_size_mb = os.path.getsize(output_path) / (1024*1024)
+        print(f"[COMBINE_WORKER] Background combination completed: {output_path} ({combined_size_mb:.1f}MB)")
+    else:
+        print(f"[COMBINE_WORKER] Background combination failed for {output_path}")
 
 def queue_video_combination(video1_path, video2_path, output_path, timestamp):
     """Queue a video combination task for background processing"""
-    global combination_queue
+    global combination_pool
+    
+    if combination_pool is None:
+        print("[WARNING] Combination workers not running - skipping combination")
+        return
     
-    task = (video1_path, video2_path, output_path, timestamp)
-    combination_queue.put(task)
-    queue_size = combination_queue.qsize()
-    print(f"[INFO] Queued video combination for background processing (queue size: {queue_size})")
+    print(f"[COMBINE_WORKER] Queueing combination: {os.path.basename(video1_path)} + {os.path.basename(video2_path)}")
+    try:
+        future = combination_pool.submit(combine_videos, video1_path, video2_path, output_path, timestamp)
+    except BrokenProcessPool:
+        # a worker died (e.g. OOM-killed) and took the pool with it - start a fresh one
+        print("[COMBINE_WORKER] Combination workers died, restarting them")
+        combination_pool = _new_combination_pool()
+        future = combination_pool.submit(combine_videos, video1_path, video2_path, output_path, timestamp)
+    future.add_done_callback(lambda f: _report_combination(f, output_path))
+    combination_futures.append(future)
+    print(f"[INFO] Queued video combination for background processing (queue size: {get_combination_queue_status()})")
 
 def get_combination_queue_status():
-    """Get the current status of the combination queue"""
-    global combination_queue
-    return combination_queue.qsize()
+    """Get the number of combinations queued or running"""
+    while combination_futures and combination_futures[0].done():
+        combination_futures.popleft()
+    return sum(not future.done() for future in combination_futures)
 
 def get_available_space_gb(path):
-    """Get available space in GB for given path"""
+    """Get available space in GB for given path (cached for SPACE_CACHE_TTL seconds)"""
+    now = time.monotonic()
+    cached = _space_cache.get(path)
+    if cached and now - cached[0] < SPACE_CACHE_TTL:
+        return cached[1]
     try:
         statvfs = os.statvfs(path)
         available_bytes = statvfs.f_frsize * statvfs.f_bavail
-        return available_bytes / (1024**3)  # Convert to GB
+        available_gb = available_bytes / (1024**3)  # Convert to GB
     except:
         return 0
+    _space_cache[path] = (now, available_gb)
+    return available_gb
+
+def consume_cached_space(path, nbytes):
+    """Subtract a finished write from the cached free space so the next check stays accurate"""
+    cached = _space_cache.get(path)
+    if cached:
+        _space_cache[path] = (cached[0], max(0, cached[1] - nbytes / (1024**3)))
 
+def invalidate_space_cache():
+    """Forget all cached free-space values, e.g. after the SSD was remounted"""
+    _space_cache.clear()
+
+@lru_cache(maxsize=1)
 def check_ffmpeg_installed():
-    """Check if ffmpeg is installed"""
+    """Check if ffmpeg is installed (probed once per process)"""
     try:
         result = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True)
         return result.returncode == 0
@@ -437,6 +508,17 @@ def check_ffmpeg_installed():
 
 def get_video_duration(video_path):
     """Get video duration in seconds using ffprobe"""
+    try:
+        st = os.stat(video_path)
+    except OSError as e:
+        print(f"[ERROR] Failed to get video duration: {e}")
+        return None
+    # keyed on size and mtime so a rewritten file is probed again
+    return _probe_video_duration(video_path, st.st_size, st.st_mtime_ns)
+
+@lru_cache(maxsize=256)
+def _probe_video_duration(video_path, size, mtime_ns):
+    """Run ffprobe for get_video_duration; cached per file version"""
     try:
         cmd = [
             "ffprobe", "-v", "quiet", "-show_entries", "format=duration",
@@ -498,6 +580,31 @@ def create_metadata_file(video_path, download_time_sec=None, video_duration_sec=
         print(f"[ERROR] Failed to create metadata file: {e}")
         return None
 
+def _parse_probe(stdout):
+    """Turn ffprobe's JSON into (stream parameters that must match for a stream-copy concat, duration)"""
+    info = json.loads(stdout)
+    params = [
+        tuple(stream.get(key) for key in STREAM_MATCH_KEYS)
+        for stream in info.get("streams", [])
+        if stream.get("codec_type") in ("video", "audio")
+    ]
+    duration = info.get("format", {}).get("duration")
+    return params, float(duration) if duration else None
+
+def probe_clips(*video_paths):
+    """Probe clips with concurrently running ffprobe processes; (stream parameters, duration) per path"""
+    procs = [
+        subprocess.Popen(
+            ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_streams", "-show_format", path],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        for path in video_paths
+    ]
+    results = []
+    for proc in procs:
+        stdout, _ = proc.communicate()
+        results.append(_parse_probe(stdout) if proc.returncode == 0 else (None, None))
+    return results
+
 def combine_videos(video1_path, video2_path, output_path, timestamp):
     """Combine two videos using ffmpeg - video1 followed by video2"""
     try:
@@ -512,51 +619,34 @@ def combine_videos(video1_path, video2_path, output_path, timestamp):
         # Track combination time
         combine_start_time = time.time()
         
-        # Method 1: Try ultra-fast concat demuxer (fastest - no re-encoding)
-        print(f"[COMBINE] Attempting ultra-fast stream copy concatenation...")
-        success = try_concat_demuxer(video1_path, video2_path, output_path)
-        
-        if success:
-            combine_end_time = time.time()
-            combine_time_sec = combine_end_time - combine_start_time
-            print(f"[COMBINE] Ultra-fast combination completed in {combine_time_sec:.1f} seconds: {output_path}")
-            
-            # Create metadata file for combined video
-            combined_size_mb = os.path.getsize(output_path) / (1024*1024)
-            create_combined_metadata_file(output_path, video1_path, video2_path, combine_time_sec, combined_size_mb)
-            return True
-        
-        # Method 2: Fallback to concat filter with stream copy
-        print(f"[COMBINE] Fallback: Using concat filter with stream copy...")
-        success = try_concat_filter_copy(video1_path, video2_path, output_path)
-        
-        if success:
-            combine_end_time = time.time()
-            combine_time_sec = combine_end_time - combine_start_time
-            print(f"[COMBINE] Fast combination completed in {combine_time_sec:.1f} seconds: {output_path}")
-            
-            # Create metadata file for combined video
-            combined_size_mb = os.path.getsize(output_path) / (1024*1024)
-            create_combined_metadata_file(output_path, video1_path, video2_path, combine_time_sec, combined_size_mb)
-            return True
-        
-        # Method 3: Last resort - re-encoding (slow but compatible)
-        print(f"[COMBINE] Last resort: Re-encoding concatenation...")
-        success = try_concat_reencode(video1_path, video2_path, output_path)
+        # Identical GoPros produce identical streams - then a stream copy always works
+        # the same probe yields the source durations for the metadata file
+        (params1, video1_duration), (params2, video2_duration) = probe_clips(video1_path, video2_path)
+        # Re-encoding always follows as a fallback: h264_v4l2m2m is missing on a Pi 5 and
+        # rejects 4K input on a Pi 4, and libx264 is slow but works everywhere
+        methods = [("Hardware re-encoding", try_concat_hw_encode),
+                   ("Concat filter", try_concat_filter_copy),
+                   ("Software re-encoding", try_concat_reencode)]
+        if params1 is not None and params1 == params2:
+            print(f"[COMBINE] Stream parameters match - using stream copy concatenation...")
+            methods.insert(0, ("Stream copy", try_concat_demuxer))
+        else:
+            print(f"[COMBINE] Stream parameters differ - re-encoding with the hardware H.264 encoder...")
         
-        combine_end_time = time.time()
-        combine_time_sec = combine_end_time - combine_start_time
+        for label, method in methods:
+            if method(video1_path, video2_path, output_path):
+                combine_time_sec = time.time() - combine_start_time
+                print(f"[COMBINE] {label} combination completed in {combine_time_sec:.1f} seconds: {output_path}")
+                
+                # Create metadata file for combined video
+                combined_size_mb = os.path.getsize(output_path) / (1024*1024)
+                create_combined_metadata_file(output_path, video1_path, video2_path, combine_time_sec, combined_size_mb,
+                                              video1_duration, video2_duration)
+                return True
+            print(f"[COMBINE] {label} failed")
         
-        if success:
-            print(f"[COMBINE] Re-encoding combination completed in {combine_time_sec:.1f} seconds: {output_path}")
-            
-            # Create metadata file for combined video
-            combined_size_mb = os.path.getsize(output_path) / (1024*1024)
-            create_combined_metadata_file(output_path, video1_path, video2_path, combine_time_sec, combined_size_mb)
-            return True
-        else:
-            print(f"[ERROR] All combination methods failed")
-            return False
+        print(f"[ERROR] All combination methods failed")
+        return False
             
     except Exception as e:
         print(f"[ERROR] Video combination failed: {e}")
@@ -565,37 +655,52 @@ def combine_videos(video1_path, video2_path, output_path, timestamp):
 def try_concat_demuxer(video1_path, video2_path, output_path):
     """Ultra-fast method: concat demuxer (no re-encoding, ~1-2 seconds)"""
     try:
-        # Create temporary file list for concat demuxer
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
-            f.write(f"file '{os.path.abspath(video1_path)}'\n")
-            f.write(f"file '{os.path.abspath(video2_path)}'\n")
-            filelist_path = f.name
+        # File list goes to ffmpeg's stdin - no temp file on the SD card
+        filelist = f"file '{os.path.abspath(video1_path)}'\nfile '{os.path.abspath(video2_path)}'\n"
         
-        try:
-            # Ultra-fast concat demuxer - just copies streams
-            cmd = [
-                "ffmpeg", "-y", "-f", "concat", "-safe", "0",
-                "-i", filelist_path,
-                "-c", "copy",  # Stream copy - no encoding
-                "-avoid_negative_ts", "make_zero",  # Fix timing issues
-                output_path
-            ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            return result.returncode == 0
-            
-        finally:
-            os.unlink(filelist_path)
+        # Ultra-fast concat demuxer - just copies streams
+        cmd = [
+            "ffmpeg", "-hide_banner", "-y", "-fflags", "+genpts",  # Regenerate timestamps across the join
+            "-f", "concat", "-safe", "0", "-protocol_whitelist", "file,pipe",
+            "-i", "pipe:0",
+            "-c", "copy",  # Stream copy - no encoding
+            "-avoid_negative_ts", "make_zero",  # Fix timing issues
+            output_path
+        ]
+        
+        result = subprocess.run(cmd, input=filelist, capture_output=True, text=True, timeout=30)
+        return result.returncode == 0
             
     except Exception as e:
         print(f"[DEBUG] Concat demuxer failed: {e}")
         return False
 
+def try_concat_hw_encode(video1_path, video2_path, output_path):
+    """Re-encode on the Pi's VideoCore H.264 block when the clips cannot be stream-copied"""
+    try:
+        cmd = [
+            "ffmpeg", "-hide_banner", "-nostdin", "-y",
+            "-i", video1_path,
+            "-i", video2_path,
+            "-filter_complex", "[0:v][0:a][1:v][1:a]concat=n=2:v=1:a=1[outv][outa]",
+            "-map", "[outv]", "-map", "[outa]",
+            "-c:v", "h264_v4l2m2m", "-b:v", HW_ENCODE_BITRATE, "-pix_fmt", "yuv420p",
+            "-c:a", "aac", "-b:a", "192k",
+            output_path
+        ]
+        
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+        return result.returncode == 0
+        
+    except Exception as e:
+        print(f"[DEBUG] Hardware re-encoding concat failed: {e}")
+        return False
+
 def try_concat_filter_copy(video1_path, video2_path, output_path):
     """Fast method: concat filter with stream copy (~5-10 seconds)"""
     try:
         cmd = [
-            "ffmpeg", "-y",
+            "ffmpeg", "-hide_banner", "-nostdin", "-y",
             "-i", video1_path,
             "-i", video2_path,
             "-filter_complex", "[0:v][0:a][1:v][1:a]concat=n=2:v=1:a=1[outv][outa]",
@@ -617,7 +722,7 @@ def try_concat_reencode(video1_path, video2_path, output_path):
     """Slowest method: Full re-encoding (30+ seconds but most compatible)"""
     try:
         cmd = [
-            "ffmpeg", "-y",
+            "ffmpeg", "-hide_banner", "-nostdin", "-y",
             "-i", video1_path,
             "-i", video2_path,
             "-filter_complex", "[0:v][0:a][1:v][1:a]concat=n=2:v=1:a=1[outv][outa]",
@@ -635,14 +740,17 @@ def try_concat_reencode(video1_path, video2_path, output_path):
         print(f"[DEBUG] Re-encoding concat failed: {e}")
         return False
 
-def create_combined_metadata_file(combined_path, video1_path, video2_path, combine_time_sec, combined_size_mb):
+def create_combined_metadata_file(combined_path, video1_path, video2_path, combine_time_sec, combined_size_mb,
+                                  video1_duration=None, video2_duration=None):
     """Create metadata file for combined video"""
     try:
         metadata_path = combined_path.replace('.mp4', '_metadata.txt').replace('.MP4', '_metadata.txt')
         
         # Get video durations and sizes
-        video1_duration = get_video_duration(video1_path)
-        video2_duration = get_video_duration(video2_path)
+        if video1_duration is None:
+            video1_duration = get_video_duration(video1_path)
+        if video2_duration is None:
+            video2_duration = get_video_duration(video2_path)
         combined_duration = get_video_duration(combined_path)
         
         video1_size_mb = os.path.getsize(video1_path) / (1024*1024) if os.path.exists(video1_path) else 0
@@ -711,21 +819,17 @@ def record_and_fetch_all():
     controllers = {gopro_id: GoProController(gopro_id, config, download_dir) 
                   for gopro_id, config in GOPROS.items()}
     
-    # Start recording on both GoPros in parallel
+    # Fire both shutters together and share one record timer, so the clips start and stop in sync
     with ThreadPoolExecutor(max_workers=2) as executor:
-        # Submit recording tasks
-        record_futures = {executor.submit(controller.record_video, RECORD_SECS): gopro_id 
-                         for gopro_id, controller in controllers.items()}
-        
-        # Wait for recordings to complete
-        record_results = {}
-        for future in as_completed(record_futures):
-            gopro_id = record_futures[future]
-            try:
-                record_results[gopro_id] = future.result()
-            except Exception as e:
-                print(f"[ERROR] Recording failed for {gopro_id}: {e}")
-                record_results[gopro_id] = False
+        # absolute deadline, so the shutter round trips do not stretch the clip
+        stop_at = time.monotonic() + RECORD_SECS
+        started = list(executor.map(GoProController.start_recording, controllers.values()))
+        print(f"[REC] Recording on both GoPros for {RECORD_SECS} seconds...")
+        time.sleep(max(0, stop_at - time.monotonic()))
+        stopped = list(executor.map(GoProController.stop_recording, controllers.values()))
+    
+    record_results = {gopro_id: ok_start and ok_stop
+                      for gopro_id, ok_start, ok_stop in zip(controllers, started, stopped)}
     
     # Wait for finalization
     print(f"[WAIT] Waiting {FINALIZE_SECS} seconds for finalization...")
@@ -790,7 +894,8 @@ def record_and_fetch_all():
             else:
                 # Generate timestamp for combined file
                 basename = os.path.basename(downloaded_files['gopro1'])
-                timestamp = basename.split("_")[0] + "_" + basename.split("_")[1]  # "YYYYMMDD_HHMMSS"
+                ts_parts = basename.split("_", 2)
+                timestamp = f"{ts_parts[0]}_{ts_parts[1]}"  # "YYYYMMDD_HHMMSS"
                 combined_filename = f"{timestamp}_combined_GoPro1+GoPro3.mp4"
                 combined_path = os.path.join(combined_dir, combined_filename)
                 
@@ -800,8 +905,8 @@ def record_and_fetch_all():
                 
                 queue_size = get_combination_queue_status()
                 print(f"[INFO] Video combination queued for background processing")
-                if queue_size > 1:
-                    print(f"[INFO] {queue_size-1} other combination tasks ahead in queue")
+                if queue_size > COMBINE_WORKERS:
+                    print(f"[INFO] {queue_size-COMBINE_WORKERS} other combination tasks ahead in queue")
                 
         except Exception as e:
             print(f"[ERROR] Failed to queue video combination: {e}")
@@ -901,102 +1006,104 @@ def main():
     else:
         print("[INFO] All GoPros already reachable - skipping connection script.")
     
-    print(f"Polling PCF8574@0x{I2C_ADDR_INPUT:02x} P{INPUT_PIN}... (Ctrl-C to stop)")
+    GPIO.setmode(GPIO.BCM)
+    GPIO.setup(TRIGGER_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+    GPIO.add_event_detect(TRIGGER_PIN, GPIO.FALLING, callback=on_trigger_interrupt,
+                          bouncetime=DEBOUNCE_MS)
+    
+    print(f"Waiting for PCF8574@0x{I2C_ADDR_INPUT:02x} P{INPUT_PIN} via /INT on GPIO{TRIGGER_PIN}... (Ctrl-C to stop)")
     print("[INFO] System ready - downloads complete immediately, combinations run in background")
     
     try:
         while True:
-            # Wait for trigger
-            if not pcf_input.port[INPUT_PIN]:
-                print("\n[TRIGGER] Input is HIGH - checking GoPro connections...")
-                
-                # Check connections before starting recording
-                all_connected, connected_gopros = check_all_gopros_connected()
-                connected_count = sum(connected_gopros.values())
+            # Sleep until the /INT callback reports the input as active
+            trigger_event.wait()
+            print("\n[TRIGGER] Input is HIGH - checking GoPro connections...")
+            
+            # Check connections before starting recording
+            all_connected, connected_gopros = check_all_gopros_connected()
+            connected_count = sum(connected_gopros.values())
+            
+            if connected_count < 2:
+                missing_gopros = [GOPROS[gid]['name'] for gid, connected in connected_gopros.items() if not connected]
+                missing_ids = [gid for gid, connected in connected_gopros.items() if not connected]
+                print(f"[WARNING] Only {connected_count}/2 GoPros connected")
+                print(f"[INFO] Missing: {', '.join(missing_gopros)}")
                 
-                if connected_count < 2:
-                    missing_gopros = [GOPROS[gid]['name'] for gid, connected in connected_gopros.items() if not connected]
-                    missing_ids = [gid for gid, connected in connected_gopros.items() if not connected]
-                    print(f"[WARNING] Only {connected_count}/2 GoPros connected")
-                    print(f"[INFO] Missing: {', '.join(missing_gopros)}")
+                # Try to reconnect missing GoPros individually first
+                if len(missing_ids) == 1:
+                    # Only one missing - try single GoPro reconnection
+                    missing_id = missing_ids[0]
+                    missing_name = GOPROS[missing_id]['name']
+                    print(f"[INFO] Attempting targeted reconnection of {missing_name}...")
                     
-                    # Try to reconnect missing GoPros individually first
-                    if len(missing_ids) == 1:
-                        # Only one missing - try single GoPro reconnection
-                        missing_id = missing_ids[0]
-                        missing_name = GOPROS[missing_id]['name']
-                        print(f"[INFO] Attempting targeted reconnection of {missing_name}...")
+                    if run_single_gopro_connect(missing_id):
+                        # Check if it worked
+                        time.sleep(3)
+                        all_connected, connected_gopros = check_all_gopros_connected()
+                        connected_count = sum(connected_gopros.values())
                         
-                        if run_single_gopro_connect(missing_id):
-                            # Check if it worked
-                            time.sleep(3)
-                            all_connected, connected_gopros = check_all_gopros_connected()
-                            connected_count = sum(connected_gopros.values())
-                            
-                            if connected_count == 2:
-                                print("[SUCCESS] Both GoPros now connected - starting recording!")
-                            else:
-                                print(f"[ERROR] Targeted reconnection failed - trying full connection script...")
-                                try:
-                                    run_connect_script()
-                                    time.sleep(5)
-                                    all_connected, connected_gopros = check_all_gopros_connected()
-                                    connected_count = sum(connected_gopros.values())
-                                    
-                                    if connected_count == 2:
-                                        print("[SUCCESS] Both GoPros now connected - starting recording!")
-                                    else:
-                                        still_missing = [GOPROS[gid]['name'] for gid, connected in connected_gopros.items() if not connected]
-                                        print(f"[ERROR] Full reconnection also failed - still missing: {', '.join(still_missing)}")
-                                        print("[INFO] Recording cancelled - both GoPros required")
-                                except Exception as e:
-                                    print(f"[ERROR] Full reconnection attempt failed: {e}")
-                                    print("[INFO] Recording cancelled - both GoPros required")
+                        if connected_count == 2:
+                            print("[SUCCESS] Both GoPros now connected - starting recording!")
                         else:
-                            print(f"[ERROR] Targeted reconnection of {missing_name} failed")
-                            print("[INFO] Recording cancelled - both GoPros required")
-                    else:
-                        # Multiple missing - use full connection script
-                        print(f"[INFO] Multiple GoPros missing - running full connection script...")
-                        try:
-                            run_connect_script()
-                            time.sleep(5)
-                            all_connected, connected_gopros = check_all_gopros_connected()
-                            connected_count = sum(connected_gopros.values())
-                            
-                            if connected_count == 2:
-                                print("[SUCCESS] Both GoPros now connected - starting recording!")
-                            else:
-                                still_missing = [GOPROS[gid]['name'] for gid, connected in connected_gopros.items() if not connected]
-                                print(f"[ERROR] Reconnection failed - still missing: {', '.join(still_missing)}")
+                            print(f"[ERROR] Targeted reconnection failed - trying full connection script...")
+                            try:
+                                run_connect_script()
+                                time.sleep(5)
+                                all_connected, connected_gopros = check_all_gopros_connected()
+                                connected_count = sum(connected_gopros.values())
+                                
+                                if connected_count == 2:
+                                    print("[SUCCESS] Both GoPros now connected - starting recording!")
+                                else:
+                                    still_missing = [GOPROS[gid]['name'] for gid, connected in connected_gopros.items() if not connected]
+                                    print(f"[ERROR] Full reconnection also failed - still missing: {', '.join(still_missing)}")
+                                    print("[INFO] Recording cancelled - both GoPros required")
+                            except Exception as e:
+                                print(f"[ERROR] Full reconnection attempt failed: {e}")
                                 print("[INFO] Recording cancelled - both GoPros required")
-                        except Exception as e:
-                            print(f"[ERROR] Reconnection attempt failed: {e}")
-                            print("[INFO] Recording cancelled - both GoPros required")
-                        
-                # Proceed only if both GoPros are connected
-                if connected_count == 2:
-                    print(f"[INFO] Both GoPros connected - starting recording")
-                    
-                    queue_size = get_combination_queue_status() 
-                    if queue_size > 0:
-                        print(f"[INFO] Note: {queue_size} video combination(s) still processing in background")
-                    
+                    else:
+                        print(f"[ERROR] Targeted reconnection of {missing_name} failed")
+                        print("[INFO] Recording cancelled - both GoPros required")
+                else:
+                    # Multiple missing - use full connection script
+                    print(f"[INFO] Multiple GoPros missing - running full connection script...")
                     try:
-                        record_and_fetch_all()
+                        run_connect_script()
+                        time.sleep(5)
+                        all_connected, connected_gopros = check_all_gopros_connected()
+                        connected_count = sum(connected_gopros.values())
+                        
+                        if connected_count == 2:
+                            print("[SUCCESS] Both GoPros now connected - starting recording!")
+                        else:
+                            still_missing = [GOPROS[gid]['name'] for gid, connected in connected_gopros.items() if not connected]
+                            print(f"[ERROR] Reconnection failed - still missing: {', '.join(still_missing)}")
+                            print("[INFO] Recording cancelled - both GoPros required")
                     except Exception as e:
-                        print(f"[ERROR] Dual recording failed: {e}", flush=True)
-                else:
-                    print(f"[INFO] Recording skipped - need 2/2 GoPros, have {connected_count}/2")
+                        print(f"[ERROR] Reconnection attempt failed: {e}")
+                        print("[INFO] Recording cancelled - both GoPros required")
+                    
+            # Proceed only if both GoPros are connected
+            if connected_count == 2:
+                print(f"[INFO] Both GoPros connected - starting recording")
                 
-                # Debounce
-                start = time.time()
-                while pcf_input.port[INPUT_PIN] and (time.time() - start) < (DEBOUNCE_MS/1000):
-                    time.sleep(POLL_INTERVAL)
+                queue_size = get_combination_queue_status() 
+                if queue_size > 0:
+                    print(f"[INFO] Note: {queue_size} video combination(s) still processing in background")
                 
-                print("[INFO] Debounce complete - ready for next trigger")
+                try:
+                    record_and_fetch_all()
+                except Exception as e:
+                    print(f"[ERROR] Dual recording failed: {e}", flush=True)
+            else:
+                print(f"[INFO] Recording skipped - need 2/2 GoPros, have {connected_count}/2")
+            
+            # Debounce: wait out the window once, then drop edges that came in while recording
+            time.sleep(DEBOUNCE_MS / 1000)
+            trigger_event.clear()
             
-            time.sleep(POLL_INTERVAL)
+            print("[INFO] Debounce complete - ready for next trigger")
             
     except KeyboardInterrupt:
         print("\nUser interrupt, shutting down...")
@@ -1023,6 +1130,7 @@ def main():
         
         # Stop the combination worker
         stop_combination_worker()
+        GPIO.cleanup()
         sys.exit(0)
 
 if __name__ == "__main__":
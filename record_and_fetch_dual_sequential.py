@@ -826,7 +826,8 @@ def record_and_fetch_all():
             else:
                 # Generate timestamp for combined file
                 basename = os.path.basename(downloaded_files['gopro1'])
-                timestamp = basename.split("_")[0] + "_" + basename.split("_")[1]  # "YYYYMMDD_HHMMSS"
+                ts_parts = basename.split("_", 2)
+                timestamp = f"{ts_parts[0]}_{ts_parts[1]}"  # "YYYYMMDD_HHMMSS"
                 combined_filename = f"{timestamp}_combined_GoPro1+GoPro3.mp4"
                 combined_path = os.path.join(combined_dir, combined_filename)
                 
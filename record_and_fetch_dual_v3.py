@@ -5,15 +5,27 @@ No external shell scripts required - all connection management integrated
 """
 
 import time, os, sys, json, subprocess
+import RPi.GPIO as GPIO
 from datetime import datetime, timezone
 import sys
 from pcf8574 import PCF8574
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
 import tempfile
+import shutil
+import struct
+import shlex
+import io
 import queue
+import itertools
+from functools import lru_cache
 import logging
 from pathlib import Path
+import requests
+from gopro_connection_manager import backoff_delay, create_interface_session, kill_interface_daemons
+from gopro_media import download_to_file
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -22,6 +34,7 @@ logger = logging.getLogger(__name__)
 # Configuration
 RECORD_SECS    = 38
 FINALIZE_SECS  = 2
+MEDIA_POLL_TIMEOUT = (1, 3)     # connect/read per media-list poll - a full card's list takes seconds
 DOWNLOAD_DIR   = "/home/pi/GoPro_Clips"
 COMBINED_DIR   = "/home/pi/GoPro_Clips/Combined"
 FALLBACK_DIR   = "/home/pi/GoPro_Clips_Backup"
@@ -50,19 +63,52 @@ I2C_ADDR_OUTPUT         = 0x20
 I2C_ADDR_INPUT          = 0x38
 START_REC_INPUT_PIN     = 0
 CAM_BUSY_OUTPUT_PIN     = 0 
-POLL_INTERVAL           = 0.05
 DEBOUNCE_MS             = 200
+TRIGGER_PIN             = 17    # BCM pin wired to the PCF8574 /INT line (open drain)
+CONN_CACHE_TTL          = 2.0   # seconds a reachability probe result is reused
+PROBE_TIMEOUT           = 2     # per-attempt timeout of a reachability probe
+# SESSIONS retry a failed connect twice, so a probe can take 3 connect timeouts plus one read
+PROBE_WAIT_SECS         = 4 * PROBE_TIMEOUT + 1
 
-# Global queue for video combination tasks
-combination_queue = queue.Queue()
+# Free-space lookups are reused for a few seconds - several checks run per trigger
+SPACE_CACHE_TTL = 5.0
+_space_cache = {}
+
+# Clip directories already created - storage only changes when the SSD drops out
+_created_dirs = set()
+
+# One keep-alive session per interface, bound to it like curl --interface
+SESSIONS = {
+    config["interface"]: create_interface_session(config["interface"], pool_connections=2, pool_maxsize=4)
+    for config in GOPROS.values()
+}
+
+# Global queue for video combination tasks: (priority, sequence, task) entries, lowest first.
+# Bounded so triggers faster than ffmpeg cannot pile up work without limit
+COMBINATION_QUEUE_SIZE = 16
+COMBINE_PRIORITY       = 1
+STOP_PRIORITY          = 2   # after the pending combinations
+combination_queue = queue.PriorityQueue(maxsize=COMBINATION_QUEUE_SIZE)
+combination_sequence = itertools.count()
 combination_thread = None
+# ffmpeg orchestration and metadata writing run in a child process, off the trigger process' GIL
+combination_process = None
+
+# Keep the trigger loop, I2C and downloads off the cores ffmpeg saturates
+TRIGGER_CPUS  = {0, 1}
+COMBINE_CPUS  = {2, 3}
+TRIGGER_NICE  = -5    # only applied when running with CAP_SYS_NICE / as root
+COMBINE_NICE  = 10
+
+# Reused for the per-camera record and download jobs of every trigger
+io_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="gopro-io")
 
 # ============================================================================
 # INTEGRATED CONNECTION MANAGER (replaces shell scripts)
 # ============================================================================
 
 class GoProConnectionManager:
-    def __init__(self):
+    def __init__(self, use_dhcp=False):
         # GoPro configurations with connection details
         self.gopros = {
             "gopro3": {
@@ -88,13 +134,67 @@ class GoProConnectionManager:
         self.python_bin = "/home/pi/gopro-ble-py/gopro-ble-py/venv/bin/python"
         self.ble_tool = "/home/pi/gopro-ble-py/gopro-ble-py/main.py"
         
+        # GoPro APs always use 10.5.5.0/24, so a static address is assigned directly.
+        # Enable DHCP only for non-standard GoPro networks.
+        self.use_dhcp = use_dhcp
+        
+        # (ip, interface) -> (monotonic time, reachable) of the last probe
+        self.conn_cache = {}
+        
+        # hci0 is shared by both GoPros, so only one BLE activation may run at a time
+        self.ble_lock = threading.Lock()
+        
+        # (config file, SSID) pairs already present on disk, checked once per process
+        self.wpa_configured = set()
+        
+    def _run_sudo_batch(self, commands, check=False):
+        """Run several root commands in one sudo + sh invocation; only the last one is checked"""
+        script = "; ".join(" ".join(shlex.quote(arg) for arg in cmd) for cmd in commands)
+        return subprocess.run(["sudo", "sh", "-c", script], check=check, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    
+    def _cleanup_commands(self, interfaces):
+        """Kill wpa_supplicant/dhclient for interfaces; returns the rm command for their control files"""
+        kill_interface_daemons(interfaces, sudo=("sudo",))
+        return [
+            ["rm", "-f"] + [f"/var/run/wpa_supplicant/{interface}" for interface in interfaces],
+        ]
+    
+    def _wait_until(self, predicate, timeout, interval=0.2):
+        """Poll predicate until it returns True or timeout seconds pass; returns the last result"""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if predicate():
+                    return True
+            except (OSError, subprocess.SubprocessError):
+                pass
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(interval)
+    
+    def _bluetooth_running(self):
+        """True once hciconfig reports hci0 as UP RUNNING"""
+        result = subprocess.run(["hciconfig", "hci0"], capture_output=True, text=True, timeout=2)
+        return "UP RUNNING" in result.stdout
+    
+    def _interface_up(self, interface):
+        """True once the kernel has the interface administratively up (IFF_UP)"""
+        with open(f"/sys/class/net/{interface}/flags") as f:
+            return int(f.read(), 16) & 0x1
+    
+    def _interface_associated(self, interface):
+        """True once the Wi-Fi link is associated (operstate up)"""
+        with open(f"/sys/class/net/{interface}/operstate") as f:
+            return f.read().strip() == "up"
+    
     def reset_bluetooth(self):
         """Reset Bluetooth adapter"""
         try:
             logger.info("Resetting Bluetooth adapter...")
-            subprocess.run(["sudo", "hciconfig", "hci0", "down"], check=True, capture_output=True)
-            subprocess.run(["sudo", "hciconfig", "hci0", "up"], check=True, capture_output=True)
-            time.sleep(3)
+            subprocess.run(["sudo", "hciconfig", "hci0", "down"], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            subprocess.run(["sudo", "hciconfig", "hci0", "up"], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            if not self._wait_until(self._bluetooth_running, timeout=5):
+                logger.warning("hci0 not reported running after 5s, continuing anyway...")
             return True
         except subprocess.CalledProcessError as e:
             logger.error(f"Failed to reset Bluetooth: {e}")
@@ -108,69 +208,78 @@ class GoProConnectionManager:
         
         print(f"Activating {name} Wi-Fi via BLE...")
         
-        for attempt in range(1, max_retries + 1):
-            print(f"BLE attempt {attempt}/{max_retries} for {name}...")
-            
-            try:
-                # Wait for BLE advertising
-                time.sleep(8)
-                
-                # Execute BLE command
-                result = subprocess.run([
-                    self.python_bin, self.ble_tool,
-                    "--interactive", "true",
-                    "--address", mac,
-                    "--command", "wifi on"
-                ], timeout=30, capture_output=True, text=True)
+        with self.ble_lock:
+            for attempt in range(1, max_retries + 1):
+                print(f"BLE attempt {attempt}/{max_retries} for {name}...")
                 
-                if result.returncode == 0:
-                    print(f"BLE command succeeded for {name}")
-                    return True
-                else:
-                    print(f"BLE attempt {attempt} failed for {name}: {result.stderr}")
+                try:
+                    # Wait for BLE advertising
+                    time.sleep(8)
                     
-            except subprocess.TimeoutExpired:
-                print(f"BLE attempt {attempt} timed out for {name}")
-            except Exception as e:
-                print(f"BLE attempt {attempt} error for {name}: {e}")
+                    # Execute BLE command
+                    result = subprocess.run([
+                        self.python_bin, self.ble_tool,
+                        "--interactive", "true",
+                        "--address", mac,
+                        "--command", "wifi on"
+                    ], timeout=30, capture_output=True, text=True)
+                    
+                    if result.returncode == 0:
+                        print(f"BLE command succeeded for {name}")
+                        return True
+                    else:
+                        print(f"BLE attempt {attempt} failed for {name}: {result.stderr}")
+                        
+                except subprocess.TimeoutExpired:
+                    print(f"BLE attempt {attempt} timed out for {name}")
+                except Exception as e:
+                    print(f"BLE attempt {attempt} error for {name}: {e}")
+                
+                if attempt < max_retries:
+                    delay = backoff_delay(attempt, base=2, cap=10)
+                    print(f"Waiting {delay:.1f} seconds before retry...")
+                    time.sleep(delay)
+                    self.reset_bluetooth()
             
-            if attempt < max_retries:
-                print("Waiting 5 seconds before retry...")
-                time.sleep(5)
-                self.reset_bluetooth()
-        
-        print(f"Error: All BLE attempts failed for {name}")
-        return False
+            print(f"Error: All BLE attempts failed for {name}")
+            return False
     
     def create_wpa_supplicant_config(self, interface, ssid, psk):
         """Create or update wpa_supplicant configuration"""
         config_file = os.path.join(self.wpa_conf_dir, f"wpa_supplicant_{interface}.conf")
         
+        # SSID/PSK are constants - once a file is known to hold the network, skip the sudo calls
+        if (config_file, ssid) in self.wpa_configured:
+            return config_file
+        
         try:
-            # Create base config if it doesn't exist
-            if not os.path.exists(config_file):
-                print(f"Creating {config_file}")
-                base_config = """ctrl_interface=DIR=/var/run/wpa_supplicant GROUP=netdev
-update_config=1
-country=DE
-"""
-                subprocess.run(["sudo", "tee", config_file], input=base_config, text=True, capture_output=True)
-            
-            # Check if network already exists
-            result = subprocess.run(["sudo", "cat", config_file], capture_output=True, text=True)
-            content = result.stdout
-            
-            if f'ssid="{ssid}"' not in content:
-                print(f"Adding {ssid} to {config_file}")
-                network_block = f"""
+            network_block = f"""
 network={{
     ssid="{ssid}"
     psk="{psk}"
     key_mgmt=WPA-PSK
 }}
 """
-                subprocess.run(["sudo", "tee", "-a", config_file], input=network_block, text=True, capture_output=True)
+            # Create base config and network in one write if the file doesn't exist
+            if not os.path.exists(config_file):
+                print(f"Creating {config_file}")
+                base_config = """ctrl_interface=DIR=/var/run/wpa_supplicant GROUP=netdev
+update_config=1
+country=DE
+"""
+                subprocess.run(["sudo", "tee", config_file], input=base_config + network_block, text=True,
+                               check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            else:
+                # Check if network already exists
+                result = subprocess.run(["sudo", "cat", config_file], capture_output=True, text=True)
+                content = result.stdout
+                
+                if f'ssid="{ssid}"' not in content:
+                    print(f"Adding {ssid} to {config_file}")
+                    subprocess.run(["sudo", "tee", "-a", config_file], input=network_block, text=True,
+                                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             
+            self.wpa_configured.add((config_file, ssid))
             return config_file
             
         except Exception as e:
@@ -182,22 +291,16 @@ network={{
         try:
             print(f"Resetting network interface {interface}...")
             
-            # Kill existing processes for this interface
-            subprocess.run(["sudo", "pkill", "-9", "-f", f"wpa_supplicant.*{interface}"], 
-                         capture_output=True)
-            subprocess.run(["sudo", "pkill", "-9", "-f", f"dhclient.*{interface}"], 
-                         capture_output=True)
-            
-            # Remove control interface file
-            control_file = f"/var/run/wpa_supplicant/{interface}"
-            subprocess.run(["sudo", "rm", "-f", control_file], capture_output=True)
-            
-            # Reset interface
-            subprocess.run(["sudo", "ip", "link", "set", interface, "down"], check=True)
-            subprocess.run(["sudo", "ip", "addr", "flush", "dev", interface], capture_output=True)
-            time.sleep(2)
-            subprocess.run(["sudo", "ip", "link", "set", interface, "up"], check=True)
-            time.sleep(3)
+            # Kill existing processes, remove the control interface file and take the
+            # interface down in one sudo call; the final "link set down" is checked
+            self._run_sudo_batch(self._cleanup_commands([interface]) + [
+                ["ip", "addr", "flush", "dev", interface],
+                ["ip", "link", "set", interface, "down"],
+            ], check=True)
+            self._wait_until(lambda: not self._interface_up(interface), timeout=2)
+            subprocess.run(["sudo", "ip", "link", "set", interface, "up"], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            if not self._wait_until(lambda: self._interface_up(interface), timeout=5):
+                print(f"Warning: {interface} not up after 5s, continuing anyway...")
             
             return True
             
@@ -205,7 +308,7 @@ network={{
             print(f"Failed to reset interface {interface}: {e}")
             return False
     
-    def connect_wifi(self, interface, config_file):
+    def connect_wifi(self, interface, config_file, associate_timeout=10):
         """Connect to Wi-Fi using wpa_supplicant"""
         try:
             print(f"Starting wpa_supplicant for {interface}...")
@@ -213,17 +316,19 @@ network={{
             # Start wpa_supplicant
             subprocess.run([
                 "sudo", "wpa_supplicant", "-B", "-i", interface, "-c", config_file
-            ], check=True, capture_output=True)
+            ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             
             # Wait for connection
             print("Waiting for WiFi connection to establish...")
-            time.sleep(5)
+            if not self._wait_until(lambda: self._interface_associated(interface), timeout=associate_timeout):
+                print(f"Warning: {interface} not associated after {associate_timeout}s, continuing anyway...")
             
             # Request DHCP lease
-            print(f"Requesting DHCP lease for {interface} (15s timeout)...")
-            subprocess.run([
-                "timeout", "15", "sudo", "dhclient", interface
-            ], capture_output=True)
+            if self.use_dhcp:
+                print(f"Requesting DHCP lease for {interface} (15s timeout)...")
+                subprocess.run([
+                    "timeout", "15", "sudo", "dhclient", interface
+                ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             
             return True
             
@@ -232,15 +337,15 @@ network={{
             return False
     
     def assign_static_ip(self, interface, ip_suffix):
-        """Assign static IP if DHCP fails"""
+        """Assign static IP unless the interface already has a GoPro address"""
         try:
             # Check if we got an IP
             result = subprocess.run([
-                "ip", "addr", "show", interface
-            ], capture_output=True, text=True)
+                "ip", "-4", "-o", "addr", "show", "dev", interface
+            ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
             
             if "inet 10.5.5." not in result.stdout:
-                print(f"DHCP failed for {interface}, assigning static IP...")
+                print(f"No GoPro address on {interface}, assigning static IP...")
                 static_ip = f"10.5.5.{ip_suffix}/24"
                 subprocess.run([
                     "sudo", "ip", "addr", "add", static_ip, "dev", interface
@@ -250,14 +355,22 @@ network={{
             
         except subprocess.CalledProcessError as e:
             print(f"Failed to assign static IP to {interface}: {e}")
-            return False
+            if self.use_dhcp:
+                return False
+            
+            # Static address conflicts - fall back to DHCP
+            print(f"Requesting DHCP lease for {interface} (15s timeout)...")
+            result = subprocess.run([
+                "timeout", "15", "sudo", "dhclient", interface
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return result.returncode == 0
     
     def add_route(self, interface, target_ip):
         """Add route to GoPro"""
         try:
             subprocess.run([
                 "sudo", "ip", "route", "replace", f"{target_ip}/32", "dev", interface
-            ], capture_output=True)
+            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             return True
         except:
             return False
@@ -271,27 +384,25 @@ network={{
         
         try:
             print(f"Verifying {name} HTTP API...")
-            time.sleep(3)
             
+            session = SESSIONS[interface]
             for attempt in range(1, 6):
                 try:
-                    result = subprocess.run([
-                        "curl", f"-m{timeout}", "--interface", interface,
-                        "-s", "-o", "/dev/null", "-w", "%{http_code}",
-                        f"http://{ip}/gp/gpControl/status"
-                    ], capture_output=True, text=True, timeout=timeout+5)
+                    response = session.get(f"http://{ip}/gp/gpControl/status", timeout=timeout)
                     
-                    if result.stdout.strip() == "200":
+                    if response.status_code == 200:
                         print(f"Success: {name} API reachable with HTTP 200")
                         return True
                     else:
-                        print(f"Attempt {attempt}/5: HTTP={result.stdout.strip()}, retrying in 3s...")
+                        print(f"Attempt {attempt}/5: HTTP={response.status_code}, retrying...")
                         
-                except subprocess.TimeoutExpired:
-                    print(f"Attempt {attempt}/5: Timeout, retrying...")
+                except requests.RequestException as e:
+                    print(f"Attempt {attempt}/5: {type(e).__name__}, retrying...")
                 
                 if attempt < 5:
-                    time.sleep(3)
+                    # Jittered exponential backoff: an early-waking GoPro is found sooner and
+                    # the two radios do not retry in lockstep
+                    time.sleep(backoff_delay(attempt, base=1, cap=8))
             
             print(f"Error: {name} connection failed after 5 attempts")
             return False
@@ -309,16 +420,14 @@ network={{
         print(f"=== Connecting to {name} only ===")
         
         # Check if interface exists
-        result = subprocess.run(["ip", "link", "show", interface], capture_output=True)
+        result = subprocess.run(["ip", "link", "show", interface], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
         if result.returncode != 0:
             print(f"Error: Interface {interface} not found")
             return False
         
         # Clean up this specific interface
         print(f"Cleaning up {interface}...")
-        subprocess.run(["sudo", "pkill", "-9", "-f", f"wpa_supplicant.*{interface}"], capture_output=True)
-        subprocess.run(["sudo", "pkill", "-9", "-f", f"dhclient.*{interface}"], capture_output=True)
-        subprocess.run(["sudo", "rm", "-f", f"/var/run/wpa_supplicant/{interface}"], capture_output=True)
+        self._run_sudo_batch(self._cleanup_commands([interface]))
         
         # Reset Bluetooth
         print("Resetting Bluetooth...")
@@ -329,15 +438,19 @@ network={{
         if not self.reset_network_interface(interface):
             return False
         
+        return self._connect_prepared_gopro(gopro_id)
+    
+    def _connect_prepared_gopro(self, gopro_id):
+        """Connect a GoPro whose Bluetooth adapter and interface are already reset"""
+        config = self.gopros[gopro_id]
+        interface = config["interface"]
+        name = config["name"]
+        
         # Activate GoPro Wi-Fi via BLE
         print(f"Waiting 8s for {name} to advertise BLE...")
         if not self.activate_gopro_wifi_ble(gopro_id):
             return False
         
-        # Wait for Wi-Fi to start
-        print(f"Waiting 5s for {name} Wi-Fi to start...")
-        time.sleep(5)
-        
         # Create wpa_supplicant config
         config_file = self.create_wpa_supplicant_config(
             interface, config["ssid"], config["psk"]
@@ -345,8 +458,9 @@ network={{
         if not config_file:
             return False
         
-        # Connect to Wi-Fi
-        if not self.connect_wifi(interface, config_file):
+        # Connect to Wi-Fi - wpa_supplicant keeps scanning until the GoPro AP is up,
+        # so the association wait also covers the camera's Wi-Fi start-up
+        if not self.connect_wifi(interface, config_file, associate_timeout=15):
             return False
         
         # Assign IP (static if DHCP fails)
@@ -366,51 +480,53 @@ network={{
             print(f"ERROR: {name} connection failed")
             return False
     
-    def connect_dual_gopros_sequential(self):
-        """Connect to both GoPros sequentially"""
-        print("Starting SEQUENTIAL dual GoPro connection process...")
+    def connect_dual_gopros(self):
+        """Connect to both GoPros in parallel after a shared reset"""
+        print("Starting PARALLEL dual GoPro connection process...")
         
         # Check if both interfaces exist
         for gopro_id, config in self.gopros.items():
             interface = config["interface"]
-            result = subprocess.run(["ip", "link", "show", interface], capture_output=True)
+            result = subprocess.run(["ip", "link", "show", interface], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             if result.returncode != 0:
                 print(f"Error: {interface} not found. Please ensure your Wi-Fi adapter is connected.")
                 return False
         
-        # Clean up existing processes
+        # Clean up existing processes and control interface files
         print("Cleaning up existing network processes...")
-        subprocess.run(["sudo", "pkill", "-9", "-f", "wpa_supplicant.*wlan"], capture_output=True)
-        subprocess.run(["sudo", "pkill", "-9", "-f", "dhclient.*wlan"], capture_output=True)
-        
-        # Clean up control interface files
-        for interface in ["wlan0", "wlan1"]:
-            subprocess.run(["sudo", "rm", "-f", f"/var/run/wpa_supplicant/{interface}"], capture_output=True)
+        interfaces = ["wlan0", "wlan1"]
+        self._run_sudo_batch(self._cleanup_commands(interfaces))
         
         # Reset Bluetooth
         print("Resetting Bluetooth to clear stuck connections...")
-        subprocess.run(["sudo", "systemctl", "restart", "bluetooth"], capture_output=True)
-        time.sleep(3)
+        subprocess.run(["sudo", "systemctl", "restart", "bluetooth"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if not self._wait_until(self._bluetooth_running, timeout=5):
+            print("Warning: hci0 not reported running after 5s, continuing anyway...")
         
         # Reset both interfaces
-        for interface in ["wlan0", "wlan1"]:
-            subprocess.run(["sudo", "ip", "link", "set", interface, "down"], capture_output=True)
-        time.sleep(2)
-        for interface in ["wlan0", "wlan1"]:
-            subprocess.run(["sudo", "ip", "link", "set", interface, "up"], capture_output=True)
-        time.sleep(3)
-        
-        # Connect GoPros sequentially
-        results = {}
-        
-        # First GoPro3
-        print("\nSTEP 1: Connecting to GoPro3 first...")
-        results["gopro3"] = self.connect_single_gopro("gopro3")
+        self._run_sudo_batch(
+            [["ip", "link", "set", interface, "down"] for interface in interfaces]
+            + [["ip", "addr", "flush", "dev", interface] for interface in interfaces]
+        )
+        self._wait_until(lambda: not any(self._interface_up(interface) for interface in interfaces), timeout=2)
+        self._run_sudo_batch([["ip", "link", "set", interface, "up"] for interface in interfaces])
+        if not self._wait_until(lambda: all(self._interface_up(interface) for interface in interfaces), timeout=5):
+            print("Warning: interfaces not up after 5s, continuing anyway...")
         
-        # Then GoPro1
-        print("\nSTEP 2: Now connecting to GoPro1...")
-        time.sleep(3)  # Small delay between connections
-        results["gopro1"] = self.connect_single_gopro("gopro1")
+        # Connect GoPros in parallel - the interfaces are independent, only the BLE step is serialized
+        print("\nConnecting to GoPro3 and GoPro1 in parallel...")
+        with ThreadPoolExecutor(max_workers=len(self.gopros)) as executor:
+            futures = {
+                gopro_id: executor.submit(self._connect_prepared_gopro, gopro_id)
+                for gopro_id in self.gopros
+            }
+            results = {}
+            for gopro_id, future in futures.items():
+                try:
+                    results[gopro_id] = future.result()
+                except Exception as e:
+                    print(f"Error connecting {self.gopros[gopro_id]['name']}: {e}")
+                    results[gopro_id] = False
         
         # Report results
         print("\n=== CONNECTION SUMMARY ===")
@@ -431,34 +547,48 @@ network={{
             print("FAILURE: Both GoPro connections failed")
             return False
     
-    def is_gopro_connected(self, gopro_id, timeout=2):
+    def is_gopro_connected(self, gopro_id, timeout=PROBE_TIMEOUT):
         """Check if a specific GoPro is connected"""
         config = self.gopros[gopro_id]
         ip = config["ip"]
         interface = config["interface"]
         
+        cached = self.conn_cache.get((ip, interface))
+        if cached and time.monotonic() - cached[0] < CONN_CACHE_TTL:
+            return cached[1]
+        
         try:
-            result = subprocess.run([
-                "curl", f"-m{timeout}", "--interface", interface,
-                "-s", "-o", "/dev/null", "-w", "%{http_code}",
-                f"http://{ip}/gp/gpControl/status"
-            ], capture_output=True, text=True)
-            
-            is_connected = result.stdout.strip() == "200"
-            print(f"[DEBUG] {interface} -> {ip}: HTTP {result.stdout.strip()}, Connected: {is_connected}")
+            # Kept-alive session bound to the interface - no curl fork, no new handshake per probe
+            response = SESSIONS[interface].get(f"http://{ip}/gp/gpControl/status", timeout=timeout)
             
-            return is_connected
+            is_connected = response.status_code == 200
+            print(f"[DEBUG] {interface} -> {ip}: HTTP {response.status_code}, Connected: {is_connected}")
             
         except Exception as e:
             print(f"[DEBUG] {interface} connection test error: {e}")
-            return False
+            is_connected = False
+        
+        self.conn_cache[(ip, interface)] = (time.monotonic(), is_connected)
+        return is_connected
+    
+    def invalidate_connection_cache(self):
+        """Forget cached probe results after the links were changed"""
+        self.conn_cache.clear()
     
     def check_all_gopros_connected(self):
         """Check connection status of all GoPros"""
         connected_gopros = {}
+        # probe all cameras at once so an offline one does not delay the others
+        futures = {gopro_id: io_pool.submit(self.is_gopro_connected, gopro_id)
+                   for gopro_id in self.gopros}
         
         for gopro_id, config in self.gopros.items():
-            if self.is_gopro_connected(gopro_id):
+            try:
+                # wait out the probe's own retries, or a slow camera reads as disconnected
+                reachable = futures[gopro_id].result(timeout=PROBE_WAIT_SECS)
+            except Exception:
+                reachable = False
+            if reachable:
                 print(f"[INFO] {config['name']} is connected")
                 connected_gopros[gopro_id] = True
             else:
@@ -475,7 +605,7 @@ network={{
 # Initialize connection manager
 connection_manager = GoProConnectionManager()
 
-def is_gopro_connected(ip, interface, timeout=2):
+def is_gopro_connected(ip, interface, timeout=PROBE_TIMEOUT):
     """Check if GoPro is reachable via specific network interface"""
     # Map interface to gopro_id for the connection manager
     gopro_id = "gopro3" if interface == "wlan0" else "gopro1"
@@ -488,15 +618,19 @@ def run_single_gopro_connect(gopro_id):
     except Exception as e:
         print(f"[ERROR] Single GoPro connection error: {e}")
         return False
+    finally:
+        connection_manager.invalidate_connection_cache()
 
 def run_connect_script():
-    """Run the sequential dual GoPro connection script"""
+    """Run the parallel dual GoPro connection"""
     try:
         print("[INFO] Running integrated Python connection manager...")
-        return connection_manager.connect_dual_gopros_sequential()
+        return connection_manager.connect_dual_gopros()
     except Exception as e:
         print(f"[ERROR] Dual connection error: {e}")
         return False
+    finally:
+        connection_manager.invalidate_connection_cache()
 
 def check_all_gopros_connected():
     """Check if all GoPros are connected"""
@@ -510,20 +644,17 @@ def check_storage_availability():
     """Check if external SSD is mounted and writable, setup fallback if needed"""
     try:
         # Check if the USB mount point exists
-        if os.path.exists("/home/pi"):
-            # Test write access
-            test_file = "/home/pi/.write_test"
+        if os.path.isdir("/home/pi"):
+            # Test write access - access() also reports a read-only remount, without creating a file
             try:
-                with open(test_file, 'w') as f:
-                    f.write("test")
-                os.remove(test_file)
+                if not os.access("/home/pi", os.W_OK):
+                    raise OSError("no write permission or read-only filesystem")
                 print("[INFO] External SSD accessible and writable at /home/pi")
                 
                 # Create the full directory structure
                 full_download_dir = "/home/pi/GoPro_Clips" 
                 full_combined_dir = "/home/pi/GoPro_Clips/Combined"
-                os.makedirs(full_download_dir, exist_ok=True)
-                os.makedirs(full_combined_dir, exist_ok=True)
+                ensure_dirs(full_download_dir, full_combined_dir)
                 
                 return full_download_dir, full_combined_dir
             except (IOError, OSError) as e:
@@ -534,35 +665,147 @@ def check_storage_availability():
     except Exception as e:
         print(f"[WARNING] Error checking external SSD: {e}")
     
-    # Fallback to local storage
+    # Fallback to local storage - the SSD is gone, so cached free-space values are stale
+    # and its directories must be created again once it is back
+    invalidate_space_cache()
+    forget_created_dirs(DOWNLOAD_DIR)
     print(f"[INFO] Using fallback storage: {FALLBACK_DIR}")
     fallback_combined = os.path.join(FALLBACK_DIR, "Combined")
-    os.makedirs(FALLBACK_DIR, exist_ok=True)
-    os.makedirs(fallback_combined, exist_ok=True)
+    ensure_dirs(FALLBACK_DIR, fallback_combined)
     return FALLBACK_DIR, fallback_combined
 
+def ensure_dirs(*paths):
+    """Create directories once; later calls for the same paths are a set lookup"""
+    for path in paths:
+        if path not in _created_dirs:
+            os.makedirs(path, exist_ok=True)
+            _created_dirs.add(path)
+
+def forget_created_dirs(root):
+    """Drop root and everything below it from the created-directory set"""
+    _created_dirs.difference_update(
+        [path for path in _created_dirs if path == root or path.startswith(root + os.sep)])
+
 def get_available_space_gb(path):
-    """Get available space in GB for given path"""
+    """Get available space in GB for given path (cached for SPACE_CACHE_TTL seconds)"""
+    now = time.monotonic()
+    cached = _space_cache.get(path)
+    if cached and now - cached[0] < SPACE_CACHE_TTL:
+        return cached[1]
     try:
-        statvfs = os.statvfs(path)
-        available_bytes = statvfs.f_frsize * statvfs.f_bavail
-        return available_bytes / (1024**3)  # Convert to GB
+        available_gb = shutil.disk_usage(path).free / (1024**3)  # Convert to GB
     except:
         return 0
+    _space_cache[path] = (now, available_gb)
+    return available_gb
+
+def consume_cached_space(path, nbytes):
+    """Subtract a finished write from the cached free space so the next check stays accurate"""
+    cached = _space_cache.get(path)
+    if cached:
+        _space_cache[path] = (cached[0], max(0, cached[1] - nbytes / (1024**3)))
+
+def invalidate_space_cache():
+    """Forget all cached free-space values, e.g. after the SSD was remounted"""
+    _space_cache.clear()
+
+def drop_page_cache(*paths):
+    """Tell the kernel the given files will not be read again soon"""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+def find_newest_mp4(directory):
+    """Return (path, size in bytes) of the most recently changed .mp4 in directory, or (None, 0)"""
+    newest_path, newest_stat = None, None
+    # one pass; non-.mp4 entries are skipped by name before any stat() call
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.name.lower().endswith('.mp4') or not entry.is_file():
+                continue
+            st = entry.stat()
+            if newest_stat is None or st.st_ctime > newest_stat.st_ctime:
+                newest_path, newest_stat = entry.path, st
+    return newest_path, newest_stat.st_size if newest_stat else 0
+
+# Resolved once at import; the combination commands use the full paths directly
+FFMPEG = shutil.which("ffmpeg")
+FFPROBE = shutil.which("ffprobe") or "ffprobe"
 
 def check_ffmpeg_installed():
     """Check if ffmpeg is installed"""
-    try:
-        result = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True)
-        return result.returncode == 0
-    except FileNotFoundError:
-        return False
+    return FFMPEG is not None
 
-def get_video_duration(video_path):
+def get_video_duration(video_path, st=None):
     """Get video duration in seconds using ffprobe"""
+    try:
+        if st is None:
+            st = os.stat(video_path)
+    except OSError as e:
+        print(f"[ERROR] Failed to get video duration: {e}")
+        return None
+    # keyed on size and mtime so a rewritten file is probed again
+    return _probe_video_duration(video_path, st.st_size, st.st_mtime_ns)
+
+def _stat_or_none(path):
+    """os.stat() that returns None for a missing file"""
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+def _mp4_duration(video_path):
+    """Read the duration from the MP4 moov/mvhd header without ffprobe; None if not found"""
+    with open(video_path, "rb") as f:
+        file_size = os.fstat(f.fileno()).st_size
+        end = file_size
+        offset = 0
+        # Top level: skip ahead to moov (GoPro writes it after the media data), then into its children
+        while offset + 8 <= end:
+            f.seek(offset)
+            size, kind = struct.unpack(">I4s", f.read(8))
+            header = 8
+            if size == 1:
+                size = struct.unpack(">Q", f.read(8))[0]
+                header = 16
+            elif size == 0:
+                size = end - offset
+            if size < header:
+                return None
+            if kind == b"moov":
+                end = offset + size
+                offset += header
+                continue
+            if kind == b"mvhd":
+                version = f.read(4)[0]
+                if version == 1:
+                    timescale, duration = struct.unpack(">16xIQ", f.read(28))
+                else:
+                    timescale, duration = struct.unpack(">8xII", f.read(16))
+                return duration / timescale if timescale else None
+            offset += size
+    return None
+
+@lru_cache(maxsize=256)
+def _probe_video_duration(video_path, size, mtime_ns):
+    """Read the MP4 header for get_video_duration, ffprobe as fallback; cached per file version"""
+    try:
+        duration = _mp4_duration(video_path)
+        if duration:
+            return duration
+    except (OSError, struct.error, IndexError):
+        pass
     try:
         cmd = [
-            "ffprobe", "-v", "quiet", "-show_entries", "format=duration",
+            FFPROBE, "-v", "quiet", "-show_entries", "format=duration",
             "-of", "csv=p=0", video_path
         ]
         result = subprocess.run(cmd, capture_output=True, text=True)
@@ -596,8 +839,8 @@ def create_metadata_file(video_path, download_time_sec=None, video_duration_sec=
         if raspberry_timestamp is None:
             raspberry_timestamp = datetime.now()
         
-        # Create metadata content
-        with open(metadata_path, 'w') as f:
+        # Build the metadata in memory and write it with a single call
+        with io.StringIO() as f:
             f.write(f"Video Metadata\n")
             f.write(f"=" * 50 + "\n")
             f.write(f"File: {os.path.basename(video_path)}\n")
@@ -622,6 +865,10 @@ def create_metadata_file(video_path, download_time_sec=None, video_duration_sec=
             
             f.write(f"Timestamp Source: Raspberry Pi (not GoPro)\n")
             f.write(f"\n")
+            content = f.getvalue()
+        
+        with open(metadata_path, 'w') as out:
+            out.write(content)
         
         print(f"[INFO] Created metadata file: {metadata_path}")
         return metadata_path
@@ -635,15 +882,18 @@ def create_combined_metadata_file(combined_path, video1_path, video2_path, combi
     try:
         metadata_path = combined_path.replace('.mp4', '_metadata.txt').replace('.MP4', '_metadata.txt')
         
-        # Get video durations and sizes
-        video1_duration = get_video_duration(video1_path)
-        video2_duration = get_video_duration(video2_path)
+        # Get video durations and sizes - one stat per source serves both
+        video1_stat = _stat_or_none(video1_path)
+        video2_stat = _stat_or_none(video2_path)
+        video1_duration = get_video_duration(video1_path, video1_stat) if video1_stat else None
+        video2_duration = get_video_duration(video2_path, video2_stat) if video2_stat else None
         combined_duration = get_video_duration(combined_path)
         
-        video1_size_mb = os.path.getsize(video1_path) / (1024*1024) if os.path.exists(video1_path) else 0
-        video2_size_mb = os.path.getsize(video2_path) / (1024*1024) if os.path.exists(video2_path) else 0
+        video1_size_mb = video1_stat.st_size / (1024*1024) if video1_stat else 0
+        video2_size_mb = video2_stat.st_size / (1024*1024) if video2_stat else 0
         
-        with open(metadata_path, 'w') as f:
+        # Build the metadata in memory and write it with a single call
+        with io.StringIO() as f:
             f.write(f"Combined Video Metadata\n")
             f.write(f"=" * 50 + "\n")
             f.write(f"Combined File: {os.path.basename(combined_path)}\n")
@@ -678,6 +928,10 @@ def create_combined_metadata_file(combined_path, video1_path, video2_path, combi
                 f.write(f"Total Source Duration: {video1_duration + video2_duration:.2f} seconds\n")
             
             f.write(f"\n")
+            content = f.getvalue()
+        
+        with open(metadata_path, 'w') as out:
+            out.write(content)
         
         print(f"[INFO] Created combined metadata file: {metadata_path}")
         return metadata_path
@@ -692,14 +946,14 @@ def create_combined_metadata_file(combined_path, video1_path, video2_path, combi
 
 def video_combination_worker():
     """Background worker thread for combining videos"""
-    global combination_queue
+    global combination_queue, combination_process
     
     print("[COMBINE_WORKER] Video combination worker started")
     
     while True:
         try:
             # Get the next combination task from queue (blocks if empty)
-            task = combination_queue.get(timeout=1)
+            _, _, task = combination_queue.get(timeout=1)
             
             if task is None:  # Poison pill to stop the worker
                 print("[COMBINE_WORKER] Worker received stop signal")
@@ -709,7 +963,16 @@ def video_combination_worker():
             
             print(f"[COMBINE_WORKER] Starting background combination: {os.path.basename(video1_path)} + {os.path.basename(video2_path)}")
             
-            success = combine_videos(video1_path, video2_path, output_path, timestamp)
+            try:
+                success = combination_process.submit(combine_videos, video1_path, video2_path,
+                                                     output_path, timestamp).result()
+            except BrokenProcessPool:
+                # the worker process died (e.g. OOM-killed) - start a fresh one for the next task
+                print("[COMBINE_WORKER] Combination process died, restarting it")
+                combination_process = _new_combination_process()
+                success = False
+            # The clips are done with - keep multi-GB videos from crowding the Pi's page cache
+            drop_page_cache(video1_path, video2_path, output_path)
             
             if success:
                 combined_size_mb = os.path.getsize(output_path) / (1024*1024)
@@ -727,10 +990,36 @@ def video_combination_worker():
             print(f"[COMBINE_WORKER] Error in combination worker: {e}")
             combination_queue.task_done()
 
+def _pin_combination_worker():
+    """Pin the combination process (and the ffmpeg it spawns) to the reserved cores at low priority"""
+    cpus = COMBINE_CPUS & set(range(os.cpu_count() or 1))
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+    os.setpriority(os.PRIO_PROCESS, 0, COMBINE_NICE)
+
+def pin_trigger_thread():
+    """Pin the calling thread - and every thread it starts later - to the trigger cores"""
+    cpus = TRIGGER_CPUS & os.sched_getaffinity(0)
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+    try:
+        os.setpriority(os.PRIO_PROCESS, 0, TRIGGER_NICE)
+    except PermissionError:
+        pass
+
+def _new_combination_process():
+    """Single-process pool for ffmpeg jobs"""
+    # forkserver: the worker must not be forked from this process once the io_pool, GPIO
+    # and BLE threads exist - it could inherit a lock (stdout, logging) held by one of them
+    return ProcessPoolExecutor(max_workers=1, initializer=_pin_combination_worker,
+                               mp_context=multiprocessing.get_context("forkserver"))
+
 def start_combination_worker():
     """Start the background video combination worker thread"""
-    global combination_thread
+    global combination_thread, combination_process
     
+    if combination_process is None:
+        combination_process = _new_combination_process()
     if combination_thread is None or not combination_thread.is_alive():
         combination_thread = threading.Thread(target=video_combination_worker, daemon=True)
         combination_thread.start()
@@ -738,22 +1027,32 @@ def start_combination_worker():
 
 def stop_combination_worker():
     """Stop the background video combination worker thread"""
-    global combination_queue, combination_thread
+    global combination_queue, combination_thread, combination_process
     
     if combination_thread and combination_thread.is_alive():
-        # Send poison pill to stop worker
-        combination_queue.put(None)
-        combination_thread.join(timeout=5)
+        # Send poison pill to stop worker - never block shutdown on a full queue,
+        # the pool shutdown below cancels the pending jobs anyway
+        try:
+            combination_queue.put_nowait((STOP_PRIORITY, next(combination_sequence), None))
+            combination_thread.join(timeout=5)
+        except queue.Full:
+            print("[INFO] Combination queue full, skipping stop signal")
         print("[INFO] Background video combination worker stopped")
+    if combination_process is not None:
+        # a running ffmpeg job finishes on its own
+        combination_process.shutdown(wait=False, cancel_futures=True)
+        combination_process = None
 
 def queue_video_combination(video1_path, video2_path, output_path, timestamp):
-    """Queue a video combination task for background processing"""
+    """Queue a video combination task for background processing; raises queue.Full when saturated"""
     global combination_queue
     
     task = (video1_path, video2_path, output_path, timestamp)
-    combination_queue.put(task)
+    # never block the trigger path - a full queue is reported to the caller instead
+    combination_queue.put_nowait((COMBINE_PRIORITY, next(combination_sequence), task))
     queue_size = combination_queue.qsize()
     print(f"[INFO] Queued video combination for background processing (queue size: {queue_size})")
+    return queue_size
 
 def get_combination_queue_status():
     """Get the current status of the combination queue"""
@@ -836,7 +1135,7 @@ def try_concat_demuxer(video1_path, video2_path, output_path):
         try:
             # Ultra-fast concat demuxer - just copies streams
             cmd = [
-                "ffmpeg", "-y", "-f", "concat", "-safe", "0",
+                FFMPEG, "-y", "-f", "concat", "-safe", "0",
                 "-i", filelist_path,
                 "-c", "copy",  # Stream copy - no encoding
                 "-avoid_negative_ts", "make_zero",  # Fix timing issues
@@ -857,7 +1156,7 @@ def try_concat_filter_copy(video1_path, video2_path, output_path):
     """Fast method: concat filter with stream copy (~5-10 seconds)"""
     try:
         cmd = [
-            "ffmpeg", "-y",
+            FFMPEG, "-y",
             "-i", video1_path,
             "-i", video2_path,
             "-filter_complex", "[0:v][0:a][1:v][1:a]concat=n=2:v=1:a=1[outv][outa]",
@@ -879,7 +1178,7 @@ def try_concat_reencode(video1_path, video2_path, output_path):
     """Slowest method: Full re-encoding (30+ seconds but most compatible)"""
     try:
         cmd = [
-            "ffmpeg", "-y",
+            FFMPEG, "-y",
             "-i", video1_path,
             "-i", video2_path,
             "-filter_complex", "[0:v][0:a][1:v][1:a]concat=n=2:v=1:a=1[outv][outa]",
@@ -909,6 +1208,14 @@ class GoProController:
         self.interface = config["interface"]
         self.name = config["name"]
         self.download_dir = os.path.join(base_download_dir, config["download_subdir"])
+        ensure_dirs(self.download_dir)
+        self.previous_clip = None
+        self.session = SESSIONS[self.interface]
+    
+    def set_download_dir(self, base_download_dir):
+        """Point downloads at a new base directory, e.g. after falling back from the SSD"""
+        self.download_dir = os.path.join(base_download_dir, self.config["download_subdir"])
+        ensure_dirs(self.download_dir)
         
     def get_gopro_camera(self):
         """Initialize GoPro camera object with specific IP"""
@@ -918,18 +1225,20 @@ class GoProController:
         """Start recording on this GoPro"""
         try:
             # Start recording
-            cmd = f"curl -m5 --interface {self.interface} -s http://{self.ip}/gp/gpControl/command/shutter?p=1"
-            result = subprocess.run(cmd, shell=True, capture_output=True)
-            if result.returncode != 0:
+            response = self.session.get(f"http://{self.ip}/gp/gpControl/command/shutter?p=1", timeout=(3, 5))
+            if response.status_code != 200:
                 raise Exception(f"Failed to start recording on {self.name}")
             
             print(f"[{self.name}] Recording started for {duration} seconds...")
-            time.sleep(duration)
+            stop_at = time.monotonic() + duration
+            # Remember the newest finished clip so wait_media_ready can spot the new one;
+            # None (snapshot failed) makes it wait out FINALIZE_SECS instead
+            self.previous_clip = self.get_latest_video_name(timeout=2, quiet=True)
+            time.sleep(max(0, stop_at - time.monotonic()))
             
             # Stop recording
-            cmd = f"curl -m5 --interface {self.interface} -s http://{self.ip}/gp/gpControl/command/shutter?p=0"
-            result = subprocess.run(cmd, shell=True, capture_output=True)
-            if result.returncode != 0:
+            response = self.session.get(f"http://{self.ip}/gp/gpControl/command/shutter?p=0", timeout=(3, 5))
+            if response.status_code != 200:
                 raise Exception(f"Failed to stop recording on {self.name}")
                 
             print(f"[{self.name}] Recording stopped")
@@ -939,27 +1248,50 @@ class GoProController:
             print(f"[ERROR] {self.name} recording failed: {e}")
             return False
     
-    def get_media_list(self):
+    def get_media_list(self, timeout=10, quiet=False):
         """Get media list from GoPro"""
         try:
-            cmd = f"curl -m10 --interface {self.interface} -s http://{self.ip}/gp/gpMediaList"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-            if result.returncode != 0:
-                raise Exception("Failed to get media list")
-            return json.loads(result.stdout)
+            response = self.session.get(f"http://{self.ip}/gp/gpMediaList", timeout=timeout)
+            response.raise_for_status()
+            return json.loads(response.content)
         except Exception as e:
-            print(f"[ERROR] {self.name} failed to get media list: {e}")
+            if not quiet:
+                print(f"[ERROR] {self.name} failed to get media list: {e}")
             return None
     
+    def get_latest_video_name(self, timeout=10, quiet=False):
+        """Return the file name of the newest video on the GoPro, or None"""
+        media = self.get_media_list(timeout, quiet)
+        try:
+            files = media["media"][0]["fs"]
+        except (TypeError, KeyError, IndexError):
+            return None
+        videos = [f["n"] for f in files if f.get("n", "").lower().endswith(".mp4")]
+        return videos[-1] if videos else None
+    
+    def wait_media_ready(self, deadline):
+        """Poll the media list until the new clip shows up or the deadline passes"""
+        if self.previous_clip is None:
+            # no snapshot to compare against - any listed clip could be the old one
+            time.sleep(max(0, deadline - time.monotonic()))
+            return False
+        delay = 0.1
+        while time.monotonic() < deadline:
+            latest = self.get_latest_video_name(timeout=MEDIA_POLL_TIMEOUT, quiet=True)
+            if latest and latest != self.previous_clip:
+                return True
+            time.sleep(max(0, min(delay, deadline - time.monotonic())))
+            delay *= 2
+        return False
+    
     def delete_file_from_gopro(self, filename):
         """Delete a specific file from GoPro storage"""
         try:
             # Use the GoPro HTTP API to delete specific file
             delete_url = f"http://{self.ip}/gp/gpControl/command/storage/delete?p=/100GOPRO/{filename}"
-            cmd = f"curl -m10 --interface {self.interface} -s '{delete_url}'"
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+            response = self.session.get(delete_url, timeout=(3, 10))
             
-            if result.returncode == 0:
+            if response.status_code == 200:
                 print(f"[{self.name}] Successfully deleted {filename} from GoPro")
                 return True
             else:
@@ -978,9 +1310,6 @@ class GoProController:
     def download_latest_clip_with_timestamp(self, recording_timestamp):
         """Download the latest video clip with a specific timestamp and delete it from GoPro after successful download"""
         try:
-            # Ensure download directory exists before checking space
-            os.makedirs(self.download_dir, exist_ok=True)
-            
             # Check available space before download
             available_gb = get_available_space_gb(self.download_dir)
             if available_gb < 1.0:  # Less than 1GB available
@@ -1017,16 +1346,21 @@ class GoProController:
             # Track download time
             download_start_time = time.time()
             
-            # Use curl with progress and interface specification for download
-            # 10 minute timeout for large files and added connection optimizations
-            cmd = f"curl -# -m600 --connect-timeout 30 --speed-time 60 --speed-limit 1024 --interface {self.interface} -o '{final_dst}' '{camera_url}'"
-            result = subprocess.run(cmd, shell=True)
+            # Stream straight into the file with 1 MiB copies; a 60s read timeout replaces
+            # curl's stall detection and a short read against Content-Length raises
+            try:
+                downloaded_bytes = download_to_file(self.session, camera_url, final_dst, timeout=(30, 60))
+                download_ok = True
+            except (requests.RequestException, OSError) as e:
+                print(f"[{self.name}] Download error: {e}")
+                download_ok = False
             
             download_end_time = time.time()
             download_time_sec = download_end_time - download_start_time
             
-            if result.returncode == 0 and os.path.exists(final_dst):
-                file_size_mb = os.path.getsize(final_dst) / (1024*1024)
+            if download_ok and os.path.exists(final_dst):
+                file_size_mb = downloaded_bytes / (1024*1024)
+                consume_cached_space(self.download_dir, downloaded_bytes)
                 print(f"[{self.name}] Successfully saved {file_size_mb:.1f}MB to {final_dst}")
                 print(f"[{self.name}] Download completed in {download_time_sec:.1f} seconds")
                 
@@ -1062,6 +1396,42 @@ class GoProController:
 # MAIN RECORDING AND FETCH FUNCTIONS
 # ============================================================================
 
+def schedule_video_combination(video1_path, video2_path, max_file_size, combined_dir, recording_timestamp):
+    """Check space for the combined video and queue it for the background worker"""
+    try:
+        # Check space for combined video (estimate 2x largest file size needed)
+        available_space = get_available_space_gb(combined_dir) * 1024**3  # Convert to bytes
+        
+        if available_space < (max_file_size * 2):
+            print(f"[WARNING] May not have enough space for video combination")
+            print(f"[INFO] Available: {available_space/(1024**3):.1f}GB, Estimated needed: {(max_file_size*2)/(1024**3):.1f}GB")
+            print("[INFO] Skipping video combination due to insufficient space")
+            return False
+        
+        # Generate filename for combined file using recording timestamp
+        combined_filename = f"{recording_timestamp}_Combined_GoPro1+GoPro3.mp4"
+        combined_path = os.path.join(combined_dir, combined_filename)
+        
+        # Queue the combination task for background processing
+        try:
+            queue_size = queue_video_combination(video1_path, video2_path, combined_path, recording_timestamp)
+        except queue.Full:
+            print(f"[ERROR] Combination queue full ({COMBINATION_QUEUE_SIZE} pending), not combining {combined_filename}")
+            print("[INFO] Source clips are kept and can be combined later")
+            return False
+        
+        print(f"[INFO] Video combination queued for background processing")
+        if queue_size > 1:
+            print(f"[INFO] {queue_size-1} other combination tasks ahead in queue")
+        return True
+            
+    except Exception as e:
+        print(f"[ERROR] Failed to queue video combination: {e}")
+        return False
+
+# Built once in main() and reused by every trigger
+controllers = {}
+
 def record_and_fetch_all():
     """Record and fetch from both GoPros simultaneously, then queue video combination"""
     # Check that both GoPros are connected before starting
@@ -1079,122 +1449,87 @@ def record_and_fetch_all():
     download_dir, combined_dir = check_storage_availability()
     
     # Set output for camera start
-    pcf_output.port[CAM_BUSY_OUTPUT_PIN] = False
+    set_cam_busy_output(False)
     
     # Store recording start time for consistent timestamping
     recording_start_time = datetime.now()
     recording_timestamp = recording_start_time.strftime("%Y-%m-%d_%H-%M-%S")
     
-    controllers = {gopro_id: GoProController(gopro_id, config, download_dir) 
-                  for gopro_id, config in GOPROS.items()}
+    # Controllers persist across triggers; only follow a storage fallback here
+    for controller in controllers.values():
+        controller.set_download_dir(download_dir)
     
     # Start recording on both GoPros in parallel
-    with ThreadPoolExecutor(max_workers=2) as executor:
-        # Submit recording tasks
-        record_futures = {executor.submit(controller.record_video, RECORD_SECS): gopro_id 
-                         for gopro_id, controller in controllers.items()}
-        
-        # Wait for recordings to complete
-        record_results = {}
-        for future in as_completed(record_futures):
-            gopro_id = record_futures[future]
-            try:
-                record_results[gopro_id] = future.result()
-            except Exception as e:
-                print(f"[ERROR] Recording failed for {gopro_id}: {e}")
-                record_results[gopro_id] = False
+    # Submit recording tasks
+    record_futures = [(gopro_id, io_pool.submit(controller.record_video, RECORD_SECS))
+                      for gopro_id, controller in controllers.items()]
     
-    # Wait for finalization
-    print(f"[WAIT] Waiting {FINALIZE_SECS} seconds for finalization...")
-    time.sleep(FINALIZE_SECS)
+    # Wait for recordings to complete - both end at the same time, so collect in submit order
+    record_results = {}
+    for gopro_id, future in record_futures:
+        try:
+            record_results[gopro_id] = future.result()
+        except Exception as e:
+            print(f"[ERROR] Recording failed for {gopro_id}: {e}")
+            record_results[gopro_id] = False
+    
+    # Wait for finalization - at most FINALIZE_SECS, less once both clips are listed
+    print(f"[WAIT] Waiting up to {FINALIZE_SECS} seconds for finalization...")
+    finalize_deadline = time.monotonic() + FINALIZE_SECS
+    list(io_pool.map(lambda c: c.wait_media_ready(finalize_deadline), controllers.values()))
     
     # Download from both GoPros in parallel with extended timeout
     downloaded_files = {}
+    downloaded_sizes = {}  # bytes, from the same stat as the path lookup
     print("[INFO] Starting parallel downloads with 10-minute timeout...")
     print(f"[INFO] Using recording timestamp: {recording_timestamp} for all files")
     
-    with ThreadPoolExecutor(max_workers=2) as executor:
-        download_futures = {executor.submit(controller.download_latest_clip_with_timestamp, 
-                                          recording_start_time): gopro_id 
-                           for gopro_id, controller in controllers.items()}
-        
-        download_results = {}
-        for future in as_completed(download_futures):
-            gopro_id = download_futures[future]
-            try:
-                result = future.result()
-                download_results[gopro_id] = result
-                # Store the path of successfully downloaded files
-                if result:
-                    # Get the latest file from the controller's download directory
-                    controller = controllers[gopro_id]
-                    files = [f for f in os.listdir(controller.download_dir) 
-                            if f.lower().endswith('.mp4')]
-                    if files:
-                        # Get the most recent file (should be the one we just downloaded)
-                        latest_file = max(files, key=lambda x: os.path.getctime(
-                            os.path.join(controller.download_dir, x)))
-                        downloaded_files[gopro_id] = os.path.join(
-                            controller.download_dir, latest_file)
-                        print(f"[INFO] {controllers[gopro_id].name} download completed successfully")
-                    else:
-                        print(f"[WARNING] {controllers[gopro_id].name} download reported success but no file found")
+    download_futures = [(gopro_id, io_pool.submit(controller.download_latest_clip_with_timestamp,
+                                                  recording_start_time))
+                        for gopro_id, controller in controllers.items()]
+    
+    download_results = {}
+    for gopro_id, future in download_futures:
+        try:
+            result = future.result()
+            download_results[gopro_id] = result
+            # Store the path of successfully downloaded files
+            if result:
+                # Get the latest file from the controller's download directory
+                controller = controllers[gopro_id]
+                # Get the most recent file (should be the one we just downloaded)
+                latest_file, latest_size = find_newest_mp4(controller.download_dir)
+                if latest_file:
+                    downloaded_files[gopro_id] = latest_file
+                    downloaded_sizes[gopro_id] = latest_size
+                    print(f"[INFO] {controllers[gopro_id].name} download completed successfully")
                 else:
-                    print(f"[ERROR] {controllers[gopro_id].name} download failed")
-            except Exception as e:
-                print(f"[ERROR] Download failed for {gopro_id}: {e}")
-                download_results[gopro_id] = False
+                    print(f"[WARNING] {controllers[gopro_id].name} download reported success but no file found")
+            else:
+                print(f"[ERROR] {controllers[gopro_id].name} download failed")
+        except Exception as e:
+            print(f"[ERROR] Download failed for {gopro_id}: {e}")
+            download_results[gopro_id] = False
     
     # Set output back - downloads complete, ready for next trigger
-    pcf_output.port[CAM_BUSY_OUTPUT_PIN] = True
-    
-    # Report results
-    successful_records = sum(record_results.values())
-    successful_downloads = sum(download_results.values())
-    print(f"[SUMMARY] {successful_records}/2 recordings successful, {successful_downloads}/2 downloads successful")
+    set_cam_busy_output(True)
     
-    # Queue video combination for background processing if both downloads were successful
+    # Queue video combination for background processing if both downloads were successful;
+    # the space check and queueing run on the I/O pool so this trigger finishes right away
     if len(downloaded_files) == 2 and 'gopro1' in downloaded_files and 'gopro3' in downloaded_files:
-        try:
-            # Create combined directory
-            os.makedirs(combined_dir, exist_ok=True)
-            
-            # Check space for combined video (estimate 2x largest file size needed)
-            max_file_size = max([os.path.getsize(f) for f in downloaded_files.values()])
-            available_space = get_available_space_gb(combined_dir) * 1024**3  # Convert to bytes
-            
-            if available_space < (max_file_size * 2):
-                print(f"[WARNING] May not have enough space for video combination")
-                print(f"[INFO] Available: {available_space/(1024**3):.1f}GB, Estimated needed: {(max_file_size*2)/(1024**3):.1f}GB")
-                print("[INFO] Skipping video combination due to insufficient space")
-            else:
-                # Generate filename for combined file using recording timestamp
-                combined_filename = f"{recording_timestamp}_Combined_GoPro1+GoPro3.mp4"
-                combined_path = os.path.join(combined_dir, combined_filename)
-                
-                # Queue the combination task for background processing
-                queue_video_combination(downloaded_files['gopro1'], downloaded_files['gopro3'], 
-                                      combined_path, recording_timestamp)
-                
-                queue_size = get_combination_queue_status()
-                print(f"[INFO] Video combination queued for background processing")
-                if queue_size > 1:
-                    print(f"[INFO] {queue_size-1} other combination tasks ahead in queue")
-                
-        except Exception as e:
-            print(f"[ERROR] Failed to queue video combination: {e}")
+        io_pool.submit(schedule_video_combination, downloaded_files['gopro1'], downloaded_files['gopro3'],
+                       max(downloaded_sizes.values()), combined_dir, recording_timestamp)
     else:
         if len(downloaded_files) < 2:
             print("[INFO] Cannot combine videos - not all downloads successful")
         else:
             print("[INFO] Cannot combine videos - missing expected GoPro files")
     
+    # Report results
+    successful_records = sum(record_results.values())
+    successful_downloads = sum(download_results.values())
+    print(f"[SUMMARY] {successful_records}/2 recordings successful, {successful_downloads}/2 downloads successful")
     print("[INFO] Ready for next trigger (combination running in background)")
-    
-    # Show current queue status
-    queue_size = get_combination_queue_status()
-    if queue_size > 0:
-        print(f"[INFO] Background combination queue: {queue_size} task(s) pending")
 
 # ============================================================================
 # MAIN PROGRAM
@@ -1204,10 +1539,34 @@ def record_and_fetch_all():
 pcf_input = PCF8574(I2C_BUS, I2C_ADDR_INPUT)
 pcf_output = PCF8574(I2C_BUS, I2C_ADDR_OUTPUT)
 
+# pcf8574 numbers pins MSB first. The output port's state is tracked here so a toggle is
+# one I2C write instead of the library's read-modify-write; unused pins stay high
+CAM_BUSY_OUTPUT_MASK = 1 << (7 - CAM_BUSY_OUTPUT_PIN)
+output_state = 0xFF
+
+def set_cam_busy_output(level):
+    """Drive the camera busy output (inverted: False = busy) with a single I2C write"""
+    global output_state
+    if level:
+        output_state |= CAM_BUSY_OUTPUT_MASK
+    else:
+        output_state &= ~CAM_BUSY_OUTPUT_MASK & 0xFF
+    pcf_output.bus.write_byte(I2C_ADDR_OUTPUT, output_state)
+
+trigger_event = threading.Event()
+
+def on_trigger_interrupt(channel):
+    """/INT fires on any port change - wake the main loop only if our input went active"""
+    if not pcf_input.port[START_REC_INPUT_PIN]:
+        trigger_event.set()
+
 def main():
+    # Before any worker thread exists, so they all inherit the trigger cores
+    pin_trigger_thread()
+    
     # Initialisierung
     # Der I2C Ausgang wird invertiert angesteuert!
-    pcf_output.port[CAM_BUSY_OUTPUT_PIN] = True
+    set_cam_busy_output(True)
     
     # Debug storage setup
     print("[DEBUG] Checking storage setup...")
@@ -1220,6 +1579,11 @@ def main():
     print(f"[DEBUG] Current working directory: {os.getcwd()}")
     print(f"[DEBUG] Home directory space: {get_available_space_gb('/home/pi'):.1f}GB")
     
+    # Controllers create their clip directories once; triggers only re-check storage
+    download_dir, combined_dir = check_storage_availability()
+    for gopro_id, config in GOPROS.items():
+        controllers[gopro_id] = GoProController(gopro_id, config, download_dir)
+    
     # Check ffmpeg installation
     if not check_ffmpeg_installed():
         print("[WARNING] ffmpeg not found. Video combination will not work.")
@@ -1277,103 +1641,106 @@ def main():
         print("[INFO] All GoPros already reachable - skipping connection script.")
     
     print("[INFO] Using Raspberry Pi time for all file timestamps (not GoPro time)")
-    print(f"Polling PCF8574@0x{I2C_ADDR_INPUT:02x} P{START_REC_INPUT_PIN}... (Ctrl-C to stop)")
+    GPIO.setmode(GPIO.BCM)
+    GPIO.setup(TRIGGER_PIN, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+    GPIO.add_event_detect(TRIGGER_PIN, GPIO.FALLING, callback=on_trigger_interrupt,
+                          bouncetime=DEBOUNCE_MS)
+    
+    print(f"Waiting for PCF8574@0x{I2C_ADDR_INPUT:02x} P{START_REC_INPUT_PIN} via /INT on GPIO{TRIGGER_PIN}... (Ctrl-C to stop)")
     print("[INFO] System ready - downloads complete immediately, combinations run in background")
     print("[INFO] No external shell script dependencies - all connection management integrated")
     
     try:
         while True:
-            # Wait for trigger
-            if not pcf_input.port[START_REC_INPUT_PIN]:
-                print("\n[TRIGGER] Input is HIGH - checking GoPro connections...")
-                
-                # Check connections before starting recording
-                all_connected, connected_gopros = check_all_gopros_connected()
-                connected_count = sum(connected_gopros.values())
+            # Sleep until the /INT interrupt reports the input as active
+            trigger_event.wait()
+            print("\n[TRIGGER] Input is HIGH - checking GoPro connections...")
+            
+            # Check connections before starting recording
+            all_connected, connected_gopros = check_all_gopros_connected()
+            connected_count = sum(connected_gopros.values())
+            
+            if connected_count < 2:
+                missing_gopros = [GOPROS[gid]['name'] for gid, connected in connected_gopros.items() if not connected]
+                missing_ids = [gid for gid, connected in connected_gopros.items() if not connected]
+                print(f"[WARNING] Only {connected_count}/2 GoPros connected")
+                print(f"[INFO] Missing: {', '.join(missing_gopros)}")
                 
-                if connected_count < 2:
-                    missing_gopros = [GOPROS[gid]['name'] for gid, connected in connected_gopros.items() if not connected]
-                    missing_ids = [gid for gid, connected in connected_gopros.items() if not connected]
-                    print(f"[WARNING] Only {connected_count}/2 GoPros connected")
-                    print(f"[INFO] Missing: {', '.join(missing_gopros)}")
+                # Try to reconnect missing GoPros individually first
+                if len(missing_ids) == 1:
+                    # Only one missing - try single GoPro reconnection
+                    missing_id = missing_ids[0]
+                    missing_name = GOPROS[missing_id]['name']
+                    print(f"[INFO] Attempting targeted reconnection of {missing_name}...")
                     
-                    # Try to reconnect missing GoPros individually first
-                    if len(missing_ids) == 1:
-                        # Only one missing - try single GoPro reconnection
-                        missing_id = missing_ids[0]
-                        missing_name = GOPROS[missing_id]['name']
-                        print(f"[INFO] Attempting targeted reconnection of {missing_name}...")
+                    if run_single_gopro_connect(missing_id):
+                        # Check if it worked
+                        time.sleep(3)
+                        all_connected, connected_gopros = check_all_gopros_connected()
+                        connected_count = sum(connected_gopros.values())
                         
-                        if run_single_gopro_connect(missing_id):
-                            # Check if it worked
-                            time.sleep(3)
-                            all_connected, connected_gopros = check_all_gopros_connected()
-                            connected_count = sum(connected_gopros.values())
-                            
-                            if connected_count == 2:
-                                print("[SUCCESS] Both GoPros now connected - starting recording!")
-                            else:
-                                print(f"[ERROR] Targeted reconnection failed - trying full connection script...")
-                                try:
-                                    run_connect_script()
-                                    time.sleep(5)
-                                    all_connected, connected_gopros = check_all_gopros_connected()
-                                    connected_count = sum(connected_gopros.values())
-                                    
-                                    if connected_count == 2:
-                                        print("[SUCCESS] Both GoPros now connected - starting recording!")
-                                    else:
-                                        still_missing = [GOPROS[gid]['name'] for gid, connected in connected_gopros.items() if not connected]
-                                        print(f"[ERROR] Full reconnection also failed - still missing: {', '.join(still_missing)}")
-                                        print("[INFO] Recording cancelled - both GoPros required")
-                                except Exception as e:
-                                    print(f"[ERROR] Full reconnection attempt failed: {e}")
-                                    print("[INFO] Recording cancelled - both GoPros required")
+                        if connected_count == 2:
+                            print("[SUCCESS] Both GoPros now connected - starting recording!")
                         else:
-                            print(f"[ERROR] Targeted reconnection of {missing_name} failed")
-                            print("[INFO] Recording cancelled - both GoPros required")
-                    else:
-                        # Multiple missing - use full connection script
-                        print(f"[INFO] Multiple GoPros missing - running full connection script...")
-                        try:
-                            run_connect_script()
-                            time.sleep(5)
-                            all_connected, connected_gopros = check_all_gopros_connected()
-                            connected_count = sum(connected_gopros.values())
-                            
-                            if connected_count == 2:
-                                print("[SUCCESS] Both GoPros now connected - starting recording!")
-                            else:
-                                still_missing = [GOPROS[gid]['name'] for gid, connected in connected_gopros.items() if not connected]
-                                print(f"[ERROR] Reconnection failed - still missing: {', '.join(still_missing)}")
+                            print(f"[ERROR] Targeted reconnection failed - trying full connection script...")
+                            try:
+                                run_connect_script()
+                                time.sleep(5)
+                                all_connected, connected_gopros = check_all_gopros_connected()
+                                connected_count = sum(connected_gopros.values())
+                                
+                                if connected_count == 2:
+                                    print("[SUCCESS] Both GoPros now connected - starting recording!")
+                                else:
+                                    still_missing = [GOPROS[gid]['name'] for gid, connected in connected_gopros.items() if not connected]
+                                    print(f"[ERROR] Full reconnection also failed - still missing: {', '.join(still_missing)}")
+                                    print("[INFO] Recording cancelled - both GoPros required")
+                            except Exception as e:
+                                print(f"[ERROR] Full reconnection attempt failed: {e}")
                                 print("[INFO] Recording cancelled - both GoPros required")
-                        except Exception as e:
-                            print(f"[ERROR] Reconnection attempt failed: {e}")
-                            print("[INFO] Recording cancelled - both GoPros required")
-                        
-                # Proceed only if both GoPros are connected
-                if connected_count == 2:
-                    print(f"[INFO] Both GoPros connected - starting recording")
-                    
-                    queue_size = get_combination_queue_status() 
-                    if queue_size > 0:
-                        print(f"[INFO] Note: {queue_size} video combination(s) still processing in background")
-                    
+                    else:
+                        print(f"[ERROR] Targeted reconnection of {missing_name} failed")
+                        print("[INFO] Recording cancelled - both GoPros required")
+                else:
+                    # Multiple missing - use full connection script
+                    print(f"[INFO] Multiple GoPros missing - running full connection script...")
                     try:
-                        record_and_fetch_all()
+                        run_connect_script()
+                        time.sleep(5)
+                        all_connected, connected_gopros = check_all_gopros_connected()
+                        connected_count = sum(connected_gopros.values())
+                        
+                        if connected_count == 2:
+                            print("[SUCCESS] Both GoPros now connected - starting recording!")
+                        else:
+                            still_missing = [GOPROS[gid]['name'] for gid, connected in connected_gopros.items() if not connected]
+                            print(f"[ERROR] Reconnection failed - still missing: {', '.join(still_missing)}")
+                            print("[INFO] Recording cancelled - both GoPros required")
                     except Exception as e:
-                        print(f"[ERROR] Dual recording failed: {e}", flush=True)
-                else:
-                    print(f"[INFO] Recording skipped - need 2/2 GoPros, have {connected_count}/2")
+                        print(f"[ERROR] Reconnection attempt failed: {e}")
+                        print("[INFO] Recording cancelled - both GoPros required")
+                    
+            # Proceed only if both GoPros are connected
+            if connected_count == 2:
+                print(f"[INFO] Both GoPros connected - starting recording")
                 
-                # Debounce
-                start = time.time()
-                while not pcf_input.port[START_REC_INPUT_PIN] and (time.time() - start) < (DEBOUNCE_MS/1000):
-                    time.sleep(POLL_INTERVAL)
+                queue_size = get_combination_queue_status() 
+                if queue_size > 0:
+                    print(f"[INFO] Note: {queue_size} video combination(s) still processing in background")
                 
-                print("[INFO] Debounce complete - ready for next trigger")
+                try:
+                    record_and_fetch_all()
+                except Exception as e:
+                    print(f"[ERROR] Dual recording failed: {e}", flush=True)
+            else:
+                print(f"[INFO] Recording skipped - need 2/2 GoPros, have {connected_count}/2")
+            
+            # Debounce: wait out the window once, then drop edges that came in while recording
+            time.sleep(DEBOUNCE_MS / 1000)
+            trigger_event.clear()
             
-            time.sleep(POLL_INTERVAL)
+            print("[INFO] Debounce complete - ready for next trigger")
+        
             
     except KeyboardInterrupt:
         print("\nUser interrupt, shutting down...")
@@ -1384,13 +1751,13 @@ def main():
             print(f"[INFO] {queue_size} video combination(s) still in progress...")
             print("[INFO] Waiting for background tasks to complete (press Ctrl+C again to force quit)")
             try:
-                # Wait for queue to empty with timeout
-                timeout = 60  # Wait up to 60 seconds
-                start_time = time.time()
-                while get_combination_queue_status() > 0 and (time.time() - start_time) < timeout:
-                    time.sleep(1)
+                # queue.join() returns once the worker marked every task done; run it in a
+                # helper thread so the wait can still time out
+                join_thread = threading.Thread(target=combination_queue.join, daemon=True)
+                join_thread.start()
+                join_thread.join(timeout=60)  # Wait up to 60 seconds
                 
-                if get_combination_queue_status() == 0:
+                if not join_thread.is_alive():
                     print("[INFO] All background combinations completed")
                 else:
                     print("[INFO] Timeout reached, some combinations may still be running")
@@ -1400,6 +1767,8 @@ def main():
         
         # Stop the combination worker
         stop_combination_worker()
+        io_pool.shutdown(wait=True)
+        GPIO.cleanup()
         sys.exit(0)
 
 if __name__ == "__main__":